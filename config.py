@@ -5,9 +5,88 @@ Centralized settings for easy tuning during testing.
 
 import os
 
+
+def _allowed_cpus() -> set[int]:
+    """CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return set(os.sched_getaffinity(0))
+    return set(range(os.cpu_count() or 4))
+
+
+def _smt_siblings(cpu: int) -> set[int]:
+    """Logical CPUs sharing a physical core with `cpu` (itself included)."""
+    try:
+        with open(f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list") as f:
+            siblings = set()
+            for part in f.read().strip().split(","):
+                lo, _, hi = part.partition("-")
+                siblings.update(range(int(lo), int(hi or lo) + 1))
+            return siblings
+    except (OSError, ValueError):
+        return {cpu}
+
+
+def _performance_cores() -> set[int]:
+    """
+    CPUs worth running whisper on.
+
+    On big.LITTLE (ARM) kernels expose per-core cpu_capacity; keep only the
+    big cores (capacity above half the max — e.g. Prime + Gold on a Pixel 4a).
+    Everywhere else every CPU we're allowed to run on counts.
+    """
+    cpus = sorted(_allowed_cpus())
+
+    capacities = {}
+    for cpu in cpus:
+        try:
+            with open(f"/sys/devices/system/cpu/cpu{cpu}/cpu_capacity") as f:
+                capacities[cpu] = int(f.read())
+        except (OSError, ValueError):
+            return set(cpus)  # No capacity info → homogeneous cores
+
+    max_capacity = max(capacities.values())
+    return {cpu for cpu, cap in capacities.items() if cap > max_capacity // 2}
+
+
+def _physical_core_count(cpus: set[int]) -> int:
+    """
+    Physical cores among `cpus` (SMT siblings share L1/L2 and only slow
+    whisper down). Counted within the given set, so a cpuset-restricted
+    container isn't credited with the host's cores.
+    """
+    if not cpus:
+        return 1
+    if os.path.exists("/sys/devices/system/cpu/cpu0/topology/thread_siblings_list"):
+        return len({min(_smt_siblings(cpu)) for cpu in cpus})
+    # No topology info: assume the host-wide SMT ratio applies to our share
+    try:
+        import psutil
+        physical = psutil.cpu_count(logical=False)
+        logical = psutil.cpu_count(logical=True)
+        if physical and logical:
+            return max(1, len(cpus) * physical // logical)
+    except ImportError:
+        pass
+    return len(cpus)
+
+
 # Audio capture
 SAMPLE_RATE = 16000  # whisper.cpp expects 16kHz
 CHANNELS = 1  # Mono
+AUDIO_QUEUE_MAXSIZE = 64  # Chunks buffered between audio thread and VAD (~2s); oldest dropped when full
+AUDIO_DRAIN_MAX = 4  # Chunks pulled from the queue per consumer wake-up
+# Pre-allocated capture slots; must exceed the chunks that can be in flight
+# (queued + being drained) so a slot is never overwritten before VAD reads it
+AUDIO_RING_FRAMES = AUDIO_QUEUE_MAXSIZE + 2 * AUDIO_DRAIN_MAX
+# Realtime scheduling for the PortAudio callback thread (Linux; needs
+# CAP_SYS_NICE or an rtprio ulimit — falls back to normal priority). None = off
+AUDIO_RT_PRIORITY = 50
+# Capture sample format, kept end to end (ring → VAD buffer → transcriber).
+# "int16" is PortAudio's native format and what the WAV needs, so the
+# whisper-server/whisper-cli paths skip the float → int16 pass (and buffers
+# halve); VAD scales each chunk to float32 on the fly. "float32" suits the
+# in-process backends, which decode float32 directly
+AUDIO_DTYPE = "float32"
 
 # VAD chunk size: Silero VAD streaming API requires EXACTLY one of:
 #   512, 1024, or 1536 samples at 16kHz (32ms, 64ms, 96ms)
@@ -21,21 +100,102 @@ VAD_MIN_SPEECH_DURATION_MS = 100  # Minimum speech before considering it real
 VAD_MIN_SILENCE_DURATION_MS = 400  # Default silence duration (unused directly — see passive/active)
 VAD_PASSIVE_SILENCE_MS = 300  # Shorter silence for wake word (brief phrase, don't wait long)
 VAD_ACTIVE_SILENCE_MS = 700  # Longer silence for commands (natural pauses in speech)
-VAD_SPEECH_PAD_MS = 300  # Padding before/after speech
+VAD_SPEECH_PAD_MS = 300  # Max silence kept per pause inside an utterance (trailing padding)
+VAD_ONNX_PATH = "./models/silero_vad.onnx"  # Silero ONNX export (torch.hub JIT model used if missing)
+# Dynamic INT8 weight quantization (built once next to VAD_ONNX_PATH; needs
+# the `onnx` package). Only used if the built model really has int8 ops —
+# the stock Silero v5 export keeps its weights inside If subgraphs that
+# quantize_dynamic leaves alone, so with it this stays FP32. "auto" = only
+# on CPUs with int8 dot-product instructions (ARM dotprod/i8mm, x86 VNNI);
+# True = always try.
+# ONNX only: the torch.hub fallback has no layers torch's dynamic
+# quantization handles
+VAD_ONNX_INT8 = False
+# Chunks per Silero call. >1 batches consecutive chunks into one session.run
+# (~1.8× less CPU per chunk at 4) but rows share the LSTM state from the
+# previous batch — an approximation — and decisions lag by one batch
+VAD_BATCH_CHUNKS = 1
+# Batch size while a command is being recorded: the 700ms active silence
+# timeout absorbs a longer lag (e.g. 4 → 128ms) better than passive mode does
+VAD_ACTIVE_BATCH_CHUNKS = VAD_BATCH_CHUNKS
+# VAD log level: "INFO" logs each utterance's start/end, "WARNING" keeps the
+# VAD thread silent apart from problems
+VAD_LOG_LEVEL = "INFO"
+
+# Energy pre-gate: before speech starts, skip Silero on chunks whose RMS is
+# within VAD_GATE_RATIO × the adaptive noise floor (obvious background silence)
+VAD_GATE_RATIO = 3.0
+VAD_NOISE_FLOOR_ALPHA = 0.01  # EMA rate; floor only updated on Silero-confirmed silence
+VAD_GATE_REFRESH_CHUNKS = 10  # Still run Silero every Nth gated chunk (320ms) so its LSTM state doesn't drift
 
 # Whisper settings
+# Quantized GGML variants: roughly half the RAM and faster than FP16 on CPU
+# (q5 is the lowest precision published by whisper.cpp's download script)
 # Passive model: lightweight, used for wake word detection (runs constantly)
-WHISPER_PASSIVE_MODEL = "base.en"     # Fast & cheap — just needs to catch "hey fox"
+# tiny (39M params) vs base (74M): ~2× cheaper per passive decode; the wake
+# word prompt keeps "hey fox" recall up on the smaller model
+WHISPER_PASSIVE_MODEL = "tiny.en-q5_1"     # Fast & cheap — just needs to catch "hey fox"
 # Active model: high-quality, used for command transcription (runs once per command)
-WHISPER_ACTIVE_MODEL = "large-v3-turbo"  # Best accuracy for actual commands
+WHISPER_ACTIVE_MODEL = "large-v3-turbo-q5_0"  # Best accuracy for actual commands
 WHISPER_LANGUAGE = "en"
-WHISPER_PATH = "./whisper.cpp/build/bin/whisper-cli"  # CMake build output
+WHISPER_PATH = "./whisper.cpp/build/bin/whisper-cli"  # CMake build output (fallback if pywhispercpp missing)
 WHISPER_MODEL_PATH = "./models"  # Path to model files
-WHISPER_THREADS = os.cpu_count() or 4  # Match available CPU cores
+WHISPER_SERVER_PATH = "./whisper.cpp/build/bin/whisper-server"
+WHISPER_SERVER_PORT = 8910  # Passive model's server; active uses the next port
+
+# Transcription backend:
+#   "auto"           — faster-whisper if it's installed and a CUDA GPU is present,
+#                      else in-process whisper.cpp, else whisper-server (if
+#                      built and httpx is installed), else the whisper-cli binary
+#   "whisper_cpp"    — in-process whisper.cpp (pywhispercpp)
+#   "whisper_server" — two persistent whisper-server processes (one per model)
+#   "whisper_cli"    — whisper-cli subprocess per utterance
+#   "faster_whisper" — CTranslate2; fp16 on CUDA (~10× faster decodes), int8 on CPU
+TRANSCRIPTION_BACKEND = "auto"
+# faster-whisper model names (fetched/cached by faster-whisper, not GGML files)
+FASTER_WHISPER_PASSIVE_MODEL = "tiny.en"
+FASTER_WHISPER_ACTIVE_MODEL = "large-v3-turbo"
+FASTER_WHISPER_COMPUTE_TYPE = "float16"  # CUDA only; "int8_float16" for low VRAM
+
+# On homogeneous CPUs, keep the first physical core (and its SMT siblings)
+# for the audio callback, VAD worker and event loop, so a long active decode
+# on every other core can't push VAD past its 32ms chunk deadline
+WHISPER_RESERVE_AUDIO_CORE = True
+
+# CPUs whisper gets pinned to (None = no pinning) and the CPU for the audio
+# callback / VAD worker / event loop (None = no pinning):
+#   big.LITTLE  → whisper on the big cores, audio on a LITTLE one (sub-ms VAD
+#                 work doesn't need a big one)
+#   homogeneous → whisper off the reserved core (needs ≥2 physical cores left)
+_all_cpus = _allowed_cpus()
+_perf_cores = _performance_cores()
+if len(_perf_cores) < len(_all_cpus):
+    WHISPER_CPU_SET = _perf_cores
+    AUDIO_CPU = min(_all_cpus - _perf_cores)
+elif WHISPER_RESERVE_AUDIO_CORE and _physical_core_count(_all_cpus) >= 3:
+    AUDIO_CPU = min(_all_cpus)
+    WHISPER_CPU_SET = _all_cpus - _smt_siblings(AUDIO_CPU)
+else:
+    WHISPER_CPU_SET = None
+    AUDIO_CPU = None
+
+# Thread count: whisper.cpp falls off a cliff past the physical-core count
+# (SMT) or onto LITTLE cores; ~8 threads is the empirical sweet spot.
+WHISPER_THREADS = max(1, min(_physical_core_count(WHISPER_CPU_SET or _perf_cores), 8))
 
 # Wake word
 WAKE_WORDS = ["hey fox"]  # Case-insensitive matches
 WAKE_WORD_TIMEOUT_S = 20  # Timeout after wake if no command (was 5 — too short)
+# Unload the large active model after this long without a command (reloaded
+# on the next wake, while the user is still speaking). None = keep resident
+WHISPER_ACTIVE_IDLE_UNLOAD_S = WAKE_WORD_TIMEOUT_S * 3
+
+# Optional keyword-spotting gate in front of passive transcription
+# (pip install openwakeword). openWakeWord .onnx/.tflite models trained on
+# WAKE_WORDS; passive utterances scoring below the threshold never reach
+# whisper. Empty = disabled, every passive utterance is transcribed
+WAKE_GATE_MODEL_PATHS = []
+WAKE_GATE_THRESHOLD = 0.5
 
 # WebSocket
 WS_HOST = "localhost"
@@ -45,4 +205,6 @@ WS_PORT = 8765
 MAX_RECORDING_DURATION_S = 30  # Maximum command length
 MAX_AUDIO_BUFFER_FRAMES = int(MAX_RECORDING_DURATION_S * SAMPLE_RATE /
                               VAD_CHUNK_SAMPLES)
+# Completed utterances waiting for the transcriber; oldest dropped when full
+UTTERANCE_QUEUE_MAXSIZE = 2
 
@@ -8,31 +8,56 @@ Fixes from review:
 - Correct VAD_CHUNK_SAMPLES for sounddevice blocksize
 - Single-client guard with proper disconnect
 - Graceful WebSocket shutdown
+- Bounded audio queue + one consumer task instead of a coroutine per chunk
+- Utterance queue + one transcriber worker: VAD keeps segmenting while the
+  previous utterance decodes, and each utterance is transcribed in the
+  state its predecessor left behind
+- Optional openWakeWord gate: passive utterances without the wake word are
+  dropped before whisper sees them
 """
 
 import asyncio
+import queue
 import websockets
 import json
+import orjson
 import sounddevice as sd
 import numpy as np
 from typing import Optional
 import signal
 import sys
+import os
+import faulthandler
+import logging
 
 from config import (
     SAMPLE_RATE, CHANNELS, VAD_CHUNK_SAMPLES,
+    AUDIO_QUEUE_MAXSIZE, AUDIO_DRAIN_MAX, AUDIO_RING_FRAMES,
+    AUDIO_RT_PRIORITY, AUDIO_CPU, AUDIO_DTYPE, UTTERANCE_QUEUE_MAXSIZE,
     WHISPER_PASSIVE_MODEL, WHISPER_ACTIVE_MODEL,
-    WAKE_WORDS, WS_HOST, WS_PORT
+    WAKE_WORDS, WS_HOST, WS_PORT, VAD_LOG_LEVEL
 )
 from vad_detector import VADDetector
 from transcriber import WhisperTranscriber
+from wake_gate import WakeWordGate
 from state_machine import StateMachine, State
 
+# Payload-free messages never change — encode them once
+_WAKE_PAYLOAD = orjson.dumps({"type": "wake"}).decode()
+_LISTENING_PAYLOAD = orjson.dumps({"type": "listening"}).decode()
+
+
+def _report_task_error(task: asyncio.Task):
+    """Done-callback for fire-and-forget tasks: surface what they raised."""
+    if not task.cancelled() and task.exception() is not None:
+        print(f"[Server] Background task failed: {task.exception()!r}")
+
 
 class VoiceServer:
     def __init__(self):
         self.vad = VADDetector()
         self.transcriber = WhisperTranscriber()
+        self.wake_gate = WakeWordGate()
         self.state_machine: Optional[StateMachine] = None
 
         self.websocket: Optional[websockets.WebSocketServerProtocol] = None
@@ -41,6 +66,29 @@ class VoiceServer:
         self.running = False
         self._shutdown_event: Optional[asyncio.Event] = None
 
+        # Status sent on every connect; rebuilt only when the wake word changes
+        self._status_payload = self._build_status_payload()
+
+        # Audio thread → event loop hand-off: bounded queue drained by one
+        # long-lived consumer task (no per-chunk coroutine scheduling)
+        self._audio_q: queue.Queue = queue.Queue(maxsize=AUDIO_QUEUE_MAXSIZE)
+        self._consumer_task: Optional[asyncio.Task] = None
+
+        # Completed utterances → single transcriber worker (created in run())
+        self._utt_q: Optional[asyncio.Queue] = None
+        self._transcriber_task: Optional[asyncio.Task] = None
+
+        # Background model loads — referenced so they can't be GC'd mid-run
+        self._warmup_task: Optional[asyncio.Task] = None
+        self._prewarm_task: Optional[asyncio.Task] = None
+
+        # Ring of capture slots written by the audio thread — no per-callback
+        # allocation on the realtime path. Queued chunks are views into it.
+        self._ring = np.empty((AUDIO_RING_FRAMES, VAD_CHUNK_SAMPLES), dtype=AUDIO_DTYPE)
+        self._ring_idx = 0
+        self._ring_frames = AUDIO_RING_FRAMES  # Instance attr: hit on every callback
+        self._audio_thread_tuned = False
+
         print(f"[Server] Initialized")
 
     async def send_message(self, msg_type: str, **kwargs):
@@ -49,9 +97,19 @@ class VoiceServer:
             return
 
         message = {"type": msg_type, **kwargs}
+        # orjson encodes straight to UTF-8 bytes; decoding keeps it a str so
+        # websockets sends a Text frame (bytes would go out as Binary,
+        # which the extension's JSON.parse(event.data) can't read)
+        await self.send_payload(orjson.dumps(message).decode())
+
+    async def send_payload(self, payload: str):
+        """Send an already-encoded JSON message to connected client."""
+        if not self.websocket:
+            return
+
         try:
-            await self.websocket.send(json.dumps(message))
-            print(f"[Server] Sent: {message}")
+            await self.websocket.send(payload)
+            print(f"[Server] Sent: {payload}")
         except websockets.exceptions.ConnectionClosed:
             print(f"[Server] Client disconnected during send")
             self.websocket = None
@@ -62,10 +120,14 @@ class VoiceServer:
 
     async def on_wake(self):
         self.vad.set_mode("active")  # Longer silence timeout for command capture
-        await self.send_message("wake")
+        # Reload the active model (if it was idled out) while the user speaks
+        if self._prewarm_task is None or self._prewarm_task.done():
+            self._prewarm_task = asyncio.create_task(self.transcriber.prewarm_active())
+            self._prewarm_task.add_done_callback(_report_task_error)
+        await self.send_payload(_WAKE_PAYLOAD)
 
     async def on_listening(self):
-        await self.send_message("listening")
+        await self.send_payload(_LISTENING_PAYLOAD)
 
     async def on_command(self, text: str):
         self.vad.set_mode("passive")  # Back to short silence for wake word
@@ -85,33 +147,117 @@ class VoiceServer:
         if status:
             print(f"[Audio] Status: {status}")
 
+        if not self._audio_thread_tuned:
+            self._tune_audio_thread()
+
         if not self.running or self.loop is None:
             return
 
-        # Copy audio data (indata is a temporary buffer view)
-        audio_chunk = indata[:, 0].copy()  # Extract mono channel
+        # Copy audio data into the next ring slot (indata is a temporary buffer view)
+        audio_chunk = self._ring[self._ring_idx]
+        self._ring_idx = (self._ring_idx + 1) % self._ring_frames
+        np.copyto(audio_chunk, indata[:, 0])  # Extract mono channel
 
-        # Schedule async processing in the event loop (thread-safe)
-        asyncio.run_coroutine_threadsafe(
-            self.process_audio_chunk(audio_chunk),
-            self.loop
-        )
+        # Hand off to the consumer task; never block the audio thread
+        try:
+            self._audio_q.put_nowait(audio_chunk)
+        except queue.Full:
+            # VAD fell behind — drop the oldest chunk to keep latency bounded
+            try:
+                self._audio_q.get_nowait()
+                self._audio_q.put_nowait(audio_chunk)
+            except (queue.Empty, queue.Full):
+                pass
+            print(f"[Audio] Queue full, dropped oldest chunk")
+
+    def _tune_audio_thread(self):
+        """
+        One-shot, from inside the first callback: give the PortAudio thread
+        realtime priority and the core whisper is kept off, so whisper bursts
+        or GC pauses in other threads can't preempt it into dropped frames.
+        """
+        self._audio_thread_tuned = True
+        tid = 0  # 0 = calling thread for the sched_* calls (Linux)
+
+        if AUDIO_RT_PRIORITY is not None and hasattr(os, "sched_setscheduler"):
+            try:
+                os.sched_setscheduler(tid, os.SCHED_FIFO, os.sched_param(AUDIO_RT_PRIORITY))
+                print(f"[Audio] Callback thread → SCHED_FIFO (priority {AUDIO_RT_PRIORITY})")
+            except OSError as e:
+                print(f"[Audio] Realtime priority unavailable ({e}), using normal scheduling")
+
+        if AUDIO_CPU is not None and hasattr(os, "sched_setaffinity"):
+            try:
+                os.sched_setaffinity(tid, {AUDIO_CPU})
+                print(f"[Audio] Callback thread pinned to CPU {AUDIO_CPU}")
+            except OSError as e:
+                print(f"[Audio] Could not pin callback thread: {e}")
+
+    def _drain_audio_queue(self) -> list[np.ndarray]:
+        """Block (in an executor thread) for the next chunk, then grab any backlog."""
+        try:
+            chunks = [self._audio_q.get(timeout=0.1)]  # Timeout so shutdown isn't blocked
+        except queue.Empty:
+            return []
+        while len(chunks) < AUDIO_DRAIN_MAX:
+            try:
+                chunks.append(self._audio_q.get_nowait())
+            except queue.Empty:
+                break
+        return chunks
+
+    async def _audio_consumer(self):
+        """Single consumer: feed queued chunks through VAD in arrival order."""
+        while self.running:
+            chunks = await self.loop.run_in_executor(None, self._drain_audio_queue)
+            for chunk in chunks:
+                await self.process_audio_chunk(chunk)
 
     async def process_audio_chunk(self, audio_chunk: np.ndarray):
         """Process incoming audio chunk through VAD → transcription pipeline."""
         try:
-            # Run VAD on the chunk
-            is_speech, utterance = self.vad.process_chunk(audio_chunk)
+            # Run VAD on the chunk (on the VAD worker thread, off the event loop)
+            is_speech, utterance = await self.vad.process_chunk_async(audio_chunk)
 
-            # If a complete utterance was detected, transcribe it
+            # Hand a completed utterance to the transcriber worker so the
+            # consumer keeps draining audio during the decode
             if utterance is not None:
-                # Use turbo model in ACTIVE state for high-quality command transcription,
-                # base model in PASSIVE state for lightweight wake word detection
-                is_active = self.state_machine and self.state_machine.state == State.ACTIVE
-                text = await self.transcriber.transcribe(utterance, active=is_active)
+                if self._utt_q.full():
+                    self._utt_q.get_nowait()  # Transcriber far behind — drop the oldest
+                    print(f"[Server] WARNING: Utterance queue full, dropped oldest")
+                self._utt_q.put_nowait(utterance)
+
+        except Exception as e:
+            print(f"[Server] Processing error: {e}")
+            await self.on_error(str(e))
+
+    async def _transcriber_worker(self):
+        """
+        Transcribe queued utterances one at a time, in order. The mode is
+        picked at dequeue, not enqueue: a command spoken right after the wake
+        word must see the ACTIVE state the wake utterance produces.
+        """
+        while True:
+            utterance = await self._utt_q.get()
+            await self.process_utterance(utterance)
+
+    async def process_utterance(self, utterance: np.ndarray):
+        """Transcribe a completed utterance and feed it to the state machine."""
+        try:
+            # Use turbo model in ACTIVE state for high-quality command transcription,
+            # tiny model in PASSIVE state for lightweight wake word detection
+            if self.state_machine and self.state_machine.state == State.ACTIVE:
+                text = await self.transcriber.transcribe_active(utterance)
+            else:
+                # Keyword spotter first: non-wake speech never costs a decode
+                if self.wake_gate.enabled and not await self.loop.run_in_executor(
+                    None, self.wake_gate.passes, utterance
+                ):
+                    return
+                text = await self.transcriber.transcribe_passive(utterance)
 
-                if text:
-                    await self.state_machine.process_transcription(text)
+            if text:
+                await self.state_machine.process_transcription(text)
 
         except Exception as e:
             print(f"[Server] Processing error: {e}")
@@ -119,6 +265,17 @@ class VoiceServer:
 
     # --- WebSocket handling ---
 
+    @staticmethod
+    def _build_status_payload() -> str:
+        """Encode the status message (server capabilities + current wake word)."""
+        return orjson.dumps({
+            "type": "status",
+            "vad": True,
+            "passive_model": WHISPER_PASSIVE_MODEL,
+            "active_model": WHISPER_ACTIVE_MODEL,
+            "wake_word": " or ".join(WAKE_WORDS),
+        }).decode()
+
     async def handle_client_message(self, message: str):
         """Handle incoming WebSocket messages from extension."""
         try:
@@ -139,11 +296,11 @@ class VoiceServer:
                 # Apply wake word change if provided
                 new_wake = data.get("wake_word")
                 if new_wake and isinstance(new_wake, str):
-                    from config import WAKE_WORDS
                     WAKE_WORDS.clear()
                     WAKE_WORDS.append(new_wake.lower())
                     # Rebuild state machine's regex patterns with new wake word
                     self.state_machine.update_wake_words(WAKE_WORDS)
+                    self._status_payload = self._build_status_payload()
                     print(f"[Server] Wake word updated to: '{new_wake}'")
 
             elif msg_type == "ack":
@@ -182,13 +339,7 @@ class VoiceServer:
         print(f"[Server] Client connected from {websocket.remote_address}")
 
         # Send initial status so extension knows server capabilities
-        await self.send_message(
-            "status",
-            vad=True,
-            passive_model=WHISPER_PASSIVE_MODEL,
-            active_model=WHISPER_ACTIVE_MODEL,
-            wake_word=" or ".join(WAKE_WORDS)
-        )
+        await self.send_payload(self._status_payload)
 
         try:
             async for message in websocket:
@@ -216,13 +367,13 @@ class VoiceServer:
             self.audio_stream = sd.InputStream(
                 samplerate=SAMPLE_RATE,
                 channels=CHANNELS,
-                dtype='float32',
+                dtype=AUDIO_DTYPE,  # Same as the ring: the copy is a plain memcpy
                 blocksize=VAD_CHUNK_SAMPLES,  # MUST match Silero's expected chunk size
                 callback=self.audio_callback
             )
             self.audio_stream.start()
             print(f"[Audio] Stream started (rate={SAMPLE_RATE}Hz, "
-                  f"blocksize={VAD_CHUNK_SAMPLES} samples)")
+                  f"blocksize={VAD_CHUNK_SAMPLES} samples, {AUDIO_DTYPE})")
 
         except Exception as e:
             print(f"[Audio] ERROR: Failed to start audio stream: {e}")
@@ -256,8 +407,15 @@ class VoiceServer:
             on_error=self.on_error
         )
 
-        # Start audio capture
+        # Start audio capture and the consumer that drains it
         self.start_audio_stream()
+        self._utt_q = asyncio.Queue(maxsize=UTTERANCE_QUEUE_MAXSIZE)
+        self._transcriber_task = asyncio.create_task(self._transcriber_worker())
+        self._consumer_task = asyncio.create_task(self._audio_consumer())
+
+        # Pre-fault both models in the background (first command isn't cold)
+        self._warmup_task = asyncio.create_task(self.transcriber.warm_up())
+        self._warmup_task.add_done_callback(_report_task_error)
 
         # Start WebSocket server
         print(f"[Server] Starting WebSocket on ws://{WS_HOST}:{WS_PORT}")
@@ -285,13 +443,35 @@ class VoiceServer:
         # Stop audio
         self.stop_audio_stream()
 
+        # Stop whisper-server processes and their HTTP clients (whisper_server backend)
+        await self.transcriber.aclose()
+
         # Signal main loop to exit
         if self._shutdown_event:
             self._shutdown_event.set()
 
 
+def _configure_logging():
+    """
+    The VAD logs through `logging` (it runs off the event loop, on the
+    detection hot path). Same "[VAD] ..." look and stream as the prints
+    elsewhere; only that logger is configured, so library loggers stay quiet.
+    """
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("[VAD] %(message)s"))
+    vad_logger = logging.getLogger("vad")
+    vad_logger.addHandler(handler)
+    vad_logger.setLevel(VAD_LOG_LEVEL)
+    vad_logger.propagate = False
+
+
 async def main():
     """Entry point."""
+    # Dump Python tracebacks of all threads on a hard crash (segfault in
+    # PortAudio / ggml / ORT) instead of dying silently
+    faulthandler.enable()
+    _configure_logging()
+
     server = VoiceServer()
 
     # Handle Ctrl+C gracefully
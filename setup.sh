@@ -13,58 +13,101 @@ cmake --version > /dev/null 2>&1 || {
     exit 1
 }
 
+# CPU build flags: BLAS off (it serializes ggml's threading), OpenMP thread
+# pool, -march=native kernels, LTO. Set WHISPER_PGO=1 to additionally
+# profile-guide the whisper-cli build on short utterances (step 4)
+WHISPER_CMAKE_FLAGS="-DGGML_BLAS=OFF -DGGML_OPENMP=ON -DGGML_NATIVE=ON -DCMAKE_INTERPROCEDURAL_OPTIMIZATION=ON"
+PGO_DIR="$PWD/whisper.cpp/build/pgo-data"
+
 # Clone and build whisper.cpp with CMake
 if [ ! -f "whisper.cpp/build/bin/whisper-cli" ]; then
     if [ ! -d "whisper.cpp" ]; then
-        echo "[1/5] Cloning whisper.cpp..."
+        echo "[1/7] Cloning whisper.cpp..."
         git clone https://github.com/ggml-org/whisper.cpp.git
     fi
-    echo "[1/5] Building whisper.cpp (CMake)..."
+    echo "[1/7] Building whisper.cpp (CMake)..."
     cd whisper.cpp
-    cmake -B build
+    cmake -B build -DCMAKE_BUILD_TYPE=Release $WHISPER_CMAKE_FLAGS
     cmake --build build -j --config Release
     cd ..
-    echo "[1/5] Build complete: whisper.cpp/build/bin/whisper-cli"
+    echo "[1/7] Build complete: whisper.cpp/build/bin/whisper-cli"
 else
-    echo "[1/5] whisper.cpp already built"
+    echo "[1/7] whisper.cpp already built"
 fi
 
 # Verify the binary works
 if ! ./whisper.cpp/build/bin/whisper-cli --help > /dev/null 2>&1; then
     echo "ERROR: whisper-cli binary exists but failed to run"
-    echo "Try rebuilding: cd whisper.cpp && rm -rf build && cmake -B build && cmake --build build -j --config Release"
+    echo "Try rebuilding: cd whisper.cpp && rm -rf build && cmake -B build -DCMAKE_BUILD_TYPE=Release $WHISPER_CMAKE_FLAGS && cmake --build build -j --config Release"
     exit 1
 fi
 
 # Download models
 mkdir -p models
 
-if [ ! -f "models/ggml-base.en.bin" ]; then
-    echo "[2/5] Downloading Whisper base.en model (passive/wake word)..."
+if [ ! -f "models/ggml-tiny.en-q5_1.bin" ]; then
+    echo "[2/7] Downloading Whisper tiny.en-q5_1 model (passive/wake word)..."
     cd whisper.cpp
-    bash ./models/download-ggml-model.sh base.en
-    cp models/ggml-base.en.bin ../models/
+    bash ./models/download-ggml-model.sh tiny.en-q5_1
+    cp models/ggml-tiny.en-q5_1.bin ../models/
     cd ..
 else
-    echo "[2/5] base.en model already downloaded"
+    echo "[2/7] tiny.en-q5_1 model already downloaded"
 fi
 
-if [ ! -f "models/ggml-large-v3-turbo.bin" ]; then
-    echo "[3/5] Downloading Whisper large-v3-turbo model (active/commands)..."
+if [ ! -f "models/ggml-large-v3-turbo-q5_0.bin" ]; then
+    echo "[3/7] Downloading Whisper large-v3-turbo-q5_0 model (active/commands)..."
     cd whisper.cpp
-    bash ./models/download-ggml-model.sh large-v3-turbo
-    cp models/ggml-large-v3-turbo.bin ../models/
+    bash ./models/download-ggml-model.sh large-v3-turbo-q5_0
+    cp models/ggml-large-v3-turbo-q5_0.bin ../models/
     cd ..
 else
-    echo "[3/5] large-v3-turbo model already downloaded"
+    echo "[3/7] large-v3-turbo-q5_0 model already downloaded"
+fi
+
+# Optional PGO rebuild (GCC): instrument, run the passive model on short clips
+# (the voice-command workload, not long-form audio), rebuild with the profile
+if [ "${WHISPER_PGO:-0}" = "1" ] && [ ! -f "$PGO_DIR/.done" ]; then
+    echo "[4/7] PGO: building instrumented whisper-cli..."
+    cd whisper.cpp
+    rm -rf "$PGO_DIR"
+    cmake -B build -DCMAKE_BUILD_TYPE=Release $WHISPER_CMAKE_FLAGS \
+        -DCMAKE_C_FLAGS="-fprofile-generate=$PGO_DIR" \
+        -DCMAKE_CXX_FLAGS="-fprofile-generate=$PGO_DIR" \
+        -DCMAKE_EXE_LINKER_FLAGS="-fprofile-generate=$PGO_DIR" \
+        -DCMAKE_SHARED_LINKER_FLAGS="-fprofile-generate=$PGO_DIR"
+    cmake --build build -j --config Release --clean-first
+    echo "[4/7] PGO: training on samples/jfk.wav..."
+    for i in 1 2 3; do
+        ./build/bin/whisper-cli -m ../models/ggml-tiny.en-q5_1.bin -f samples/jfk.wav --no-prints > /dev/null
+    done
+    echo "[4/7] PGO: rebuilding with profile..."
+    cmake -B build -DCMAKE_BUILD_TYPE=Release $WHISPER_CMAKE_FLAGS \
+        -DCMAKE_C_FLAGS="-fprofile-use=$PGO_DIR -fprofile-correction -Wno-missing-profile" \
+        -DCMAKE_CXX_FLAGS="-fprofile-use=$PGO_DIR -fprofile-correction -Wno-missing-profile" \
+        -DCMAKE_EXE_LINKER_FLAGS="" -DCMAKE_SHARED_LINKER_FLAGS=""
+    cmake --build build -j --config Release --clean-first
+    touch "$PGO_DIR/.done"
+    cd ..
+    echo "[4/7] PGO build complete"
+else
+    echo "[4/7] PGO build skipped (set WHISPER_PGO=1 to enable)"
+fi
+
+if [ ! -f "models/silero_vad.onnx" ]; then
+    echo "[5/7] Downloading Silero VAD ONNX model..."
+    curl -L -o models/silero_vad.onnx \
+        https://github.com/snakers4/silero-vad/raw/master/src/silero_vad/data/silero_vad.onnx
+else
+    echo "[5/7] Silero VAD ONNX model already downloaded"
 fi
 
 # Install Python dependencies
-echo "[4/5] Installing Python dependencies..."
+echo "[6/7] Installing Python dependencies..."
 pip3 install -r requirements.txt
 
 # Test microphone
-echo "[5/5] Testing microphone access..."
+echo "[7/7] Testing microphone access..."
 python3 -c "
 import sounddevice as sd
 devices = sd.query_devices()
@@ -8,11 +8,106 @@ and process it immediately instead of discarding it.
 """
 
 import re
+import functools
 from enum import Enum
 from typing import Optional, Callable
 import asyncio
 from config import WAKE_WORDS, WAKE_WORD_TIMEOUT_S
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None  # Prefilter falls back to one substring test per word
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None  # Large wake word sets stay on the re alternation
+
+# Below this many phrases the re alternation (~0.3µs per search) beats
+# Hyperscan's per-scan callback overhead
+_HYPERSCAN_MIN_PHRASES = 8
+
+# Punctuation/whitespace allowed between the wake word and the command
+_FILLER = ",.!? \t\n\r\f\v"
+
+
+def _phrase_pattern(phrase: str) -> str:
+    """Regex for one phrase, tolerating punctuation/whitespace between words."""
+    # "hey tab" → matches "hey tab", "hey, tab", "hey. tab", "hey  tab"
+    words = phrase.split()  # Already normalized by _set_wake_words
+    return r'[\s,.\-!?]*'.join(re.escape(w) for w in words)
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_wake(phrases: tuple[str, ...], flags: int = 0, overlapping: bool = False) -> re.Pattern:
+    """
+    Compile wake phrases (already in match-priority order) into ONE alternation
+    regex, one named group (w0, w1, ...) per phrase. Cached, so repeated
+    update_wake_words calls with the same list (e.g. every extension
+    reconnect) skip the recompile.
+
+    Case-sensitive by default — it's searched against the already-lowered
+    text, which lets re use its fast literal-prefix scan (~4× faster than
+    IGNORECASE on a typical transcription).
+
+    overlapping=True wraps the alternation in a lookahead, so finditer()
+    reports the highest-priority phrase starting at EVERY position instead
+    of skipping past the first match.
+    """
+    branches = [f'(?P<w{i}>{_phrase_pattern(phrase)})' for i, phrase in enumerate(phrases)]
+
+    # (?!) never matches — keeps an empty wake word list safe
+    pattern = '|'.join(branches) or '(?!)'
+    return re.compile(f'(?=(?:{pattern}))' if overlapping else pattern, flags)
+
+
+def _best_wake(regex: re.Pattern, overlapping: re.Pattern, text: str) -> Optional[tuple[int, int, int]]:
+    """
+    Highest-priority phrase in text as (phrase index, start, end), its
+    leftmost occurrence — the result of trying each phrase in turn over the
+    whole text. One search settles the common case; only when a lesser
+    phrase wins the leftmost position are the later positions checked.
+    """
+    m = regex.search(text)
+    if m is None:
+        return None
+    index = int(m.lastgroup[1:])
+    if index == 0:
+        return index, m.start(), m.end()
+    # A better phrase can only start at or after this one
+    best = (index, m.start(), m.end())
+    for m in overlapping.finditer(text, m.start() + 1):
+        i = int(m.lastgroup[1:])
+        if i < best[0]:
+            best = (i, *m.span(m.lastgroup))
+            if i == 0:
+                break
+    return best
+
+
+def _compile_hyperscan(phrases: list[str]):
+    """
+    Compile the phrases into a Hyperscan block-mode database (a SIMD DFA
+    scan that stays flat as the phrase count grows), or None if the optional
+    library is missing, the set is small, or compilation fails.
+    """
+    if hyperscan is None or len(phrases) < _HYPERSCAN_MIN_PHRASES:
+        return None
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[_phrase_pattern(p).encode() for p in phrases],
+            ids=list(range(len(phrases))),
+            elements=len(phrases),
+            # Start offsets are needed to slice out the remainder
+            flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * len(phrases),
+        )
+        return db
+    except Exception as e:
+        print(f"[StateMachine] Hyperscan compile failed ({e}), using re")
+        return None
+
 
 class State(Enum):
     PASSIVE = "passive"  # Listening for wake word
@@ -20,6 +115,16 @@ class State(Enum):
 
 
 class StateMachine:
+    # Fixed attribute set: no per-instance __dict__, and self.state (read on
+    # every utterance) is a slot load
+    __slots__ = (
+        "state", "on_wake", "on_listening", "on_command", "on_error",
+        "active_timeout_task", "_callback_tasks",
+        "_wake_patterns", "_wake_regex", "_wake_regex_ci", "_wake_hs_db",
+        "_wake_regex_all", "_wake_regex_all_ci",
+        "_wake_first_words", "_first_word_ac",
+    )
+
     def __init__(
         self,
         on_wake: Callable,
@@ -35,6 +140,10 @@ class StateMachine:
             on_listening: Called when actively listening for command
             on_command: Called with transcribed command text
             on_error: Called on errors
+
+        on_wake and on_listening run concurrently, and on_command runs in the
+        background while the machine returns to PASSIVE — none of them may
+        depend on another having finished.
         """
         self.state = State.PASSIVE
         self.on_wake = on_wake
@@ -43,33 +152,57 @@ class StateMachine:
         self.on_error = on_error
 
         self.active_timeout_task: Optional[asyncio.Task] = None
+        # Strong refs to fire-and-forget callback tasks (the loop only keeps weak ones)
+        self._callback_tasks: set[asyncio.Task] = set()
 
         # Pre-compile wake word patterns for efficient matching
-        # Sort by length descending so "tab whisperer" matches before "tab"
-        self._wake_patterns = sorted(WAKE_WORDS, key=len, reverse=True)
-
-        # Build regex patterns that tolerate punctuation/whitespace between words
-        # "hey tab" → matches "hey tab", "hey, tab", "hey. tab", "hey  tab"
-        self._wake_regexes = []
-        for phrase in self._wake_patterns:
-            words = phrase.lower().split()
-            # Between each word, allow optional punctuation + whitespace
-            pattern = r'[\s,.\-!?]*'.join(re.escape(w) for w in words)
-            self._wake_regexes.append((phrase, re.compile(pattern, re.IGNORECASE)))
+        self._set_wake_words(WAKE_WORDS)
 
         print(f"[StateMachine] Initialized in {self.state.value} mode")
         print(f"[StateMachine] Wake words: {self._wake_patterns}")
 
     def update_wake_words(self, wake_words: list[str]):
         """Update wake words at runtime (e.g. from extension config message)."""
-        self._wake_patterns = sorted(wake_words, key=len, reverse=True)
-        self._wake_regexes = []
-        for phrase in self._wake_patterns:
-            words = phrase.lower().split()
-            pattern = r'[\s,.\-!?]*'.join(re.escape(w) for w in words)
-            self._wake_regexes.append((phrase, re.compile(pattern, re.IGNORECASE)))
+        self._set_wake_words(wake_words)
         print(f"[StateMachine] Wake words updated: {self._wake_patterns}")
 
+    def _set_wake_words(self, wake_words: list[str]):
+        """
+        Compile all wake words into ONE alternation regex so a transcription
+        is scanned once, not once per phrase (a second, overlapping pass only
+        when a shorter phrase is the leftmost match). The match is mapped back
+        to its phrase via m.lastgroup.
+        """
+        # Normalize once (lowercase, single spaces) and drop duplicates/empties,
+        # so "Hey Fox" and "hey  fox" don't compile into two identical branches
+        normalized = dict.fromkeys(" ".join(w.lower().split()) for w in wake_words)
+        normalized.pop("", None)
+
+        # Sort by length descending so "tab whisperer" wins over "tab" — the
+        # longest phrase present anywhere in the text, not the leftmost one
+        self._wake_patterns = sorted(normalized, key=len, reverse=True)
+        phrases = tuple(self._wake_patterns)
+        self._wake_regex = _compile_wake(phrases)
+        self._wake_regex_ci = _compile_wake(phrases, re.IGNORECASE)  # Non-length-preserving lower()
+        # Overlapping variants: find a longer phrase past a shorter leftmost one
+        self._wake_regex_all = _compile_wake(phrases, overlapping=True)
+        self._wake_regex_all_ci = _compile_wake(phrases, re.IGNORECASE, overlapping=True)
+        self._wake_hs_db = _compile_hyperscan(self._wake_patterns)
+
+        # Reject-path prefilter: any regex match contains its phrase's first
+        # word verbatim, so if none occurs in the text the regex can't match.
+        # (A substring test, not a token test — the regex isn't word-bounded
+        # and "Hey, fox" tokenizes to "hey,".)
+        self._wake_first_words = tuple({phrase.split()[0] for phrase in self._wake_patterns})
+        # With several distinct first words, one Aho–Corasick pass over the
+        # text replaces W substring scans (pyahocorasick is optional)
+        self._first_word_ac = None
+        if ahocorasick is not None and len(self._wake_first_words) > 1:
+            self._first_word_ac = ahocorasick.Automaton()
+            for word in self._wake_first_words:
+                self._first_word_ac.add_word(word, word)
+            self._first_word_ac.make_automaton()
+
     def extract_wake_word(self, text: str) -> tuple[bool, str]:
         """
         Check if text contains a wake word and extract the remainder.
@@ -78,6 +211,9 @@ class StateMachine:
             (found, remainder): found=True if wake word detected,
                                 remainder=text after the wake word (may be empty)
 
+        Longer phrases take priority wherever they occur: with ["tab whisperer",
+        "tab"], "tab, tab whisperer close" → (True, "close").
+
         Example:
             "hey tab group my tabs" → (True, "group my tabs")
             "hey tab"              → (True, "")
@@ -85,23 +221,52 @@ class StateMachine:
         """
         text_stripped = text.strip()
 
-        for phrase, pattern in self._wake_regexes:
-            match = pattern.search(text_stripped)
-            if match:
-                # Extract everything after the matched wake word region
-                after = text_stripped[match.end():].strip()
-                # Clean up common filler between wake word and command
-                # e.g. "hey tab, please group..." → "please group..."
-                after = re.sub(r'^[,.\s!?]+', '', after).strip()
-
-                print(f"[StateMachine] Wake word '{phrase}' matched "
-                      f"'{text_stripped[match.start():match.end()]}' in '{text_stripped[:60]}'")
-                if after:
-                    print(f"[StateMachine] Remainder after wake word: '{after}'")
-                return True, after
+        # Fast path: most passive transcriptions contain no wake word at all
+        lowered = text_stripped.lower()
+        if self._first_word_ac is not None:
+            if next(self._first_word_ac.iter(lowered), None) is None:
+                return False, ""
+        elif not any(word in lowered for word in self._wake_first_words):
+            return False, ""
+
+        match = self._find_wake(text_stripped, lowered)
+        if match:
+            index, start, end = match
+            phrase = self._wake_patterns[index]
+            # Extract everything after the matched wake word region, cleaning up
+            # common filler between wake word and command
+            # e.g. "hey tab, please group..." → "please group..."
+            after = text_stripped[end:].lstrip(_FILLER)  # Already right-stripped
+
+            print(f"[StateMachine] Wake word '{phrase}' matched "
+                  f"'{text_stripped[start:end]}' in '{text_stripped[:60]}'")
+            if after:
+                print(f"[StateMachine] Remainder after wake word: '{after}'")
+            return True, after
 
         return False, ""
 
+    def _find_wake(self, text_stripped: str, lowered: str) -> Optional[tuple[int, int, int]]:
+        """
+        Wake phrase match as (phrase index, start, end) — the earliest (longest)
+        phrase present, at its leftmost occurrence — or None.
+        """
+        if len(lowered) != len(text_stripped):
+            # lower() changed the length (e.g. 'İ'), so offsets into lowered
+            # wouldn't line up with the original text — match case-insensitively
+            return _best_wake(self._wake_regex_ci, self._wake_regex_all_ci, text_stripped)
+
+        # Hyperscan offsets are byte offsets — only equal to str indices for ASCII
+        if self._wake_hs_db is not None and lowered.isascii():
+            hits = []
+            self._wake_hs_db.scan(
+                lowered.encode(),
+                match_event_handler=lambda i, start, end, flags, ctx: hits.append((i, start, end))
+            )
+            return min(hits) if hits else None
+
+        return _best_wake(self._wake_regex, self._wake_regex_all, lowered)
+
     async def process_transcription(self, text: str):
         """
         Process transcribed text based on current state.
@@ -139,7 +304,11 @@ class StateMachine:
         self._cancel_timeout()
 
         print(f"[StateMachine] Command: '{text}'")
-        await self.on_command(text)
+        # Dispatch without waiting for it, so the wake word window reopens
+        # immediately instead of after the send completes
+        task = asyncio.create_task(self.on_command(text))
+        self._callback_tasks.add(task)
+        task.add_done_callback(self._callback_tasks.discard)
 
         # Return to passive after processing
         await self.transition_to_passive()
@@ -152,8 +321,8 @@ class StateMachine:
         print(f"[StateMachine] PASSIVE → ACTIVE")
         self.state = State.ACTIVE
 
-        await self.on_wake()
-        await self.on_listening()
+        # Independent notifications — don't serialize them on the wake path
+        await asyncio.gather(self.on_wake(), self.on_listening())
 
         # Set timeout — if no command arrives, return to passive
         self.active_timeout_task = asyncio.create_task(self._active_timeout())
@@ -0,0 +1,89 @@
+"""
+_SileroTorch state handling, against a small scripted stand-in for the
+torch.hub model (no download): single chunks and batches must share one
+LSTM state and context, as per-mode batch sizes mix them mid-stream.
+"""
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+import vad_detector
+from config import VAD_CHUNK_SAMPLES
+
+
+class _Core(torch.nn.Module):
+    """Stateless (context|chunk, state) → (prob, state), like Silero v5's core."""
+
+    def forward(self, x: torch.Tensor, state: torch.Tensor):
+        new_state = 0.5 * state + x[:, 64:].mean(dim=1).view(1, -1, 1)
+        prob = torch.sigmoid(new_state[0, :, :1] + 10.0 * x[:, :64].mean(dim=1, keepdim=True))
+        return prob, new_state
+
+
+class _Wrapper(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self._model = _Core()
+
+    def forward(self, x: torch.Tensor, sr: int) -> torch.Tensor:
+        return x.mean()
+
+    @torch.jit.export
+    def reset_states(self):
+        pass
+
+
+@pytest.fixture
+def silero(monkeypatch):
+    monkeypatch.setattr(torch.hub, "load", lambda **kwargs: (torch.jit.script(_Wrapper()), None))
+    return lambda: vad_detector._SileroTorch(batch_size=4)
+
+
+@pytest.fixture
+def chunks():
+    rng = np.random.default_rng(0)
+    return (0.3 * rng.standard_normal((24, VAD_CHUNK_SAMPLES))).astype(np.float32)
+
+
+def _stream(model, chunks) -> np.ndarray:
+    return np.array([model(chunk) for chunk in chunks])
+
+
+def test_single_chunk_batches_match_streaming(silero, chunks):
+    # A one-row batch is exact, so alternating the two paths must change nothing
+    mixed = silero()
+    probs = []
+    for i, chunk in enumerate(chunks):
+        probs.append(mixed(chunk) if i % 3 else float(mixed.run_batch(chunk[None, :])[0]))
+    np.testing.assert_allclose(probs, _stream(silero(), chunks), rtol=0, atol=1e-6)
+
+
+def test_mode_switch_carries_state_and_context(silero, chunks):
+    # Passive (streaming) → active (batches of 4) → passive, one stream
+    switched, reference = silero(), silero()
+    probs = list(_stream(switched, chunks[:6]))
+    for i in range(6, 18, 4):
+        probs.extend(switched.run_batch(chunks[i:i + 4]))
+    probs.extend(_stream(switched, chunks[18:]))
+
+    # Same stream, each segment fed row by row from the state the last one left
+    expected = list(_stream(reference, chunks[:6]))
+    for i in range(6, 18, 4):
+        expected.extend(reference.run_batch(chunks[i:i + 4]))
+    expected.extend(float(reference.run_batch(c[None, :])[0]) for c in chunks[18:])
+
+    np.testing.assert_allclose(probs, expected, rtol=0, atol=1e-6)
+
+    # And the state after the batches really was carried: a fresh model
+    # streaming the tail alone disagrees
+    assert not np.allclose(probs[18:], _stream(silero(), chunks[18:]), atol=1e-3)
+
+
+def test_reset_clears_shared_state(silero, chunks):
+    model = silero()
+    first = _stream(model, chunks[:5])
+    model.run_batch(chunks[5:9])
+    model.reset_states()
+    np.testing.assert_allclose(_stream(model, chunks[:5]), first, rtol=0, atol=1e-6)
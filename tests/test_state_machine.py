@@ -0,0 +1,33 @@
+"""
+Wake word extraction: which phrase wins and what's left as the command.
+"""
+
+import pytest
+
+from state_machine import StateMachine
+
+
+async def _noop(*args):
+    pass
+
+
+@pytest.fixture
+def machine():
+    return StateMachine(on_wake=_noop, on_listening=_noop, on_command=_noop, on_error=_noop)
+
+
+def test_longer_phrase_wins_over_earlier_shorter_one(machine):
+    machine.update_wake_words(["tab whisperer", "tab"])
+    assert machine.extract_wake_word("tab, tab whisperer close") == (True, "close")
+
+
+def test_longer_phrase_found_past_an_overlapping_shorter_one(machine):
+    # "hey tab" starts first, but the longer "tab whisperer" outranks it
+    machine.update_wake_words(["tab whisperer", "hey tab"])
+    assert machine.extract_wake_word("hey tab whisperer close it") == (True, "close it")
+
+
+def test_shorter_phrase_still_matches_alone(machine):
+    machine.update_wake_words(["tab whisperer", "tab"])
+    assert machine.extract_wake_word("Tab, group my tabs") == (True, "group my tabs")
+    assert machine.extract_wake_word("random speech") == (False, "")
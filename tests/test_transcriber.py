@@ -0,0 +1,31 @@
+"""
+whisper-cli stdout parsing (the -nt transcript, timestamps tolerated).
+"""
+
+import pytest
+
+from transcriber import WhisperTranscriber
+
+parse = WhisperTranscriber._parse_stdout
+
+
+@pytest.mark.parametrize("output, expected", [
+    (" Group my tabs by topic.\n", "Group my tabs by topic."),
+    ("[00:00:00.000 --> 00:00:02.000]   hey fox\n[00:00:02.000 --> 00:00:03.000]  close it\n",
+     "hey fox close it"),
+    ("[music playing\n", "[music playing"),      # Unclosed bracket: not a prefix
+    ("[a] [b] text\n", "[b] text"),              # Only the first group is a prefix
+    ("\n  \r\n hello \r\n\n", "hello"),
+])
+def test_keeps_text_lines(output, expected):
+    assert parse(output) == expected
+
+
+@pytest.mark.parametrize("output", [
+    "",
+    " [BLANK_AUDIO]\n",
+    "[00:00:00.000 --> 00:00:02.000]   [BLANK_AUDIO]\n",
+    "[00:00:00.000 --> 00:00:02.000]\n \n",
+])
+def test_tag_and_blank_lines_yield_nothing(output):
+    assert parse(output) is None
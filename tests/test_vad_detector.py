@@ -0,0 +1,94 @@
+"""
+VADDetector onset/offset logic against a stand-in Silero model, so these run
+without onnxruntime, torch or the model files.
+"""
+
+import numpy as np
+import pytest
+
+import vad_detector
+from config import VAD_CHUNK_SAMPLES
+
+FLOOR_RMS = 0.01             # Background level the noise floor settles on
+QUIET_SPEECH_RMS = 0.025     # 2.5× the floor: under the 3× energy gate
+SPEECH_RMS_THRESHOLD = 0.02  # What the stand-in model calls speech
+
+
+class _FakeSilero:
+    """Speech iff the chunk is louder than SPEECH_RMS_THRESHOLD."""
+
+    def __init__(self, batch_size: int = 1):
+        self.calls = 0
+
+    def __call__(self, chunk: np.ndarray) -> float:
+        self.calls += 1
+        rms = float(np.sqrt(np.mean(np.square(chunk, dtype=np.float32))))
+        return 1.0 if rms > SPEECH_RMS_THRESHOLD else 0.0
+
+    def run_batch(self, chunks: np.ndarray) -> np.ndarray:
+        return np.array([self(chunk) for chunk in chunks])
+
+    def reset_states(self):
+        pass
+
+
+@pytest.fixture
+def make_detector(monkeypatch):
+    monkeypatch.setattr(vad_detector, "VAD_ONNX_PATH", "/nonexistent/silero_vad.onnx")
+    monkeypatch.setattr(vad_detector, "_SileroTorch", _FakeSilero)
+
+    def make(batch: int = 1, active_batch: int = None) -> vad_detector.VADDetector:
+        monkeypatch.setattr(vad_detector, "VAD_BATCH_CHUNKS", batch)
+        monkeypatch.setattr(vad_detector, "VAD_ACTIVE_BATCH_CHUNKS", active_batch or batch)
+        return vad_detector.VADDetector()
+
+    return make
+
+
+def _chunk(rng: np.random.Generator, rms: float) -> np.ndarray:
+    return (rms * rng.standard_normal(VAD_CHUNK_SAMPLES)).astype(np.float32)
+
+
+def _feed(detector, rms_levels, seed: int = 0) -> list[int]:
+    """Run the levels through process_chunk; return each utterance's frame count."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for rms in rms_levels:
+        _, utterance = detector.process_chunk(_chunk(rng, rms))
+        if utterance is not None:
+            frames.append(len(utterance) // VAD_CHUNK_SAMPLES)
+    return frames
+
+
+@pytest.mark.parametrize("batch", [1, 4])
+def test_quiet_speech_below_energy_gate_is_detected(make_detector, batch):
+    # Speech under the gate ratio is only scored on refresh chunks at first;
+    # gate-skipped chunks in between must not restart the onset count
+    detector = make_detector(batch)
+    assert _feed(detector, [FLOOR_RMS] * 60) == []
+    assert QUIET_SPEECH_RMS < detector._noise_floor * vad_detector.VAD_GATE_RATIO
+
+    utterances = _feed(detector, [QUIET_SPEECH_RMS] * 60 + [FLOOR_RMS] * 40, seed=1)
+    assert len(utterances) == 1
+    assert utterances[0] >= 40
+
+
+def test_isolated_clicks_do_not_start_speech(make_detector):
+    detector = make_detector()
+    levels = ([FLOOR_RMS] * 30 + [0.5]) * 6 + [FLOOR_RMS] * 30
+    assert _feed(detector, levels) == []
+
+
+def test_mode_switch_mid_utterance_keeps_every_frame(make_detector):
+    # Passive streams chunk by chunk, active batches 4: switching modes in
+    # the middle of speech must neither drop nor duplicate pending chunks
+    detector = make_detector(batch=1, active_batch=4)
+    speech = _feed(detector, [FLOOR_RMS] * 40 + [0.1] * 10)
+    detector.set_mode("active")
+    speech += _feed(detector, [0.1] * 13, seed=1)
+    detector.set_mode("passive")
+    speech += _feed(detector, [0.1] * 7 + [FLOOR_RMS] * 20, seed=2)
+
+    assert len(speech) == 1
+    # 30 speech chunks + lead-in (pad) + stored trailing silence (pad)
+    assert speech[0] == 30 + 2 * detector._pad_frames
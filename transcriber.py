@@ -1,71 +1,412 @@
 """
 Whisper transcription using whisper.cpp for maximum performance.
-Uses subprocess to call the compiled binary.
+Runs whisper.cpp in-process via pywhispercpp so both models stay resident;
+falls back to calling the compiled whisper-cli binary when it isn't installed.
+On CUDA machines faster-whisper (CTranslate2) can take over both models,
+and without the bindings a pair of persistent whisper-server processes
+replaces the per-utterance whisper-cli fork (see TRANSCRIPTION_BACKEND).
 
 Key fixes from review:
-- Pipe PCM via temp WAV (stdin pipe not supported by whisper-cli for WAV header)
-- Use -otxt + --output-file for clean text output (no stdout parsing needed)
+- Pipe an in-memory int16 WAV to whisper-cli over stdin (-f -), no temp WAV
+- Read the text from stdout with -nt (no timestamps): no TXT temp file
 - Removed --print-colors (that ENABLES color codes, not disables)
-- Removed --output-txt (writes file next to input, orphans temp files)
 - Dynamic thread count from config
+- In-process bindings: model loaded once at startup, float32 audio passed
+  straight to whisper_full (no fork/exec, model reload, or WAV round-trip)
+- Model files readahead (posix_fadvise) and a silent warm-up decode per
+  model at startup, so the first command doesn't pay the cold start
+- Active model unloaded after WHISPER_ACTIVE_IDLE_UNLOAD_S of disuse and
+  prewarmed again on wake, so idle RAM is just the passive model
+- whisper-server backend: one long-lived server per model, fed the
+  in-memory WAV over loopback HTTP — no fork or model reload per utterance
+- Optional GPU backend: faster-whisper with fp16 on CUDA, greedy decoding
+  and its own VAD filter off (our Silero VAD already segmented the audio)
 """
 
+import re
 import subprocess
-import tempfile
-import wave
+import time
+import urllib.request
+import struct
 import os
 import numpy as np
 from pathlib import Path
 from typing import Optional
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from config import (
     SAMPLE_RATE, CHANNELS, WHISPER_PATH, WHISPER_MODEL_PATH,
     WHISPER_PASSIVE_MODEL, WHISPER_ACTIVE_MODEL, WHISPER_LANGUAGE,
-    WHISPER_THREADS, MAX_RECORDING_DURATION_S, WAKE_WORDS
+    WHISPER_THREADS, WHISPER_CPU_SET, MAX_RECORDING_DURATION_S, WAKE_WORDS,
+    TRANSCRIPTION_BACKEND, FASTER_WHISPER_PASSIVE_MODEL,
+    FASTER_WHISPER_ACTIVE_MODEL, FASTER_WHISPER_COMPUTE_TYPE,
+    WHISPER_ACTIVE_IDLE_UNLOAD_S, WHISPER_SERVER_PATH, WHISPER_SERVER_PORT
 )
 
+try:
+    from pywhispercpp.model import Model as WhisperModel
+except ImportError:
+    WhisperModel = None  # Fall back to the whisper-cli subprocess path
+
+try:
+    import ctranslate2
+    from faster_whisper import WhisperModel as FasterWhisperModel
+except ImportError:
+    FasterWhisperModel = None  # GPU backend is optional
+
+try:
+    import httpx
+except ImportError:
+    httpx = None  # Only needed by the whisper_server backend
+
+_BACKENDS = ("auto", "whisper_cpp", "whisper_server", "whisper_cli", "faster_whisper")
+# Backends whose models live in this process (and can be unloaded/prewarmed)
+_IN_PROCESS = ("whisper_cpp", "faster_whisper")
+
+# 44-byte canonical PCM WAV header (RIFF + fmt + data chunk headers)
+_WAV_HEADER = struct.Struct('<4sI4s4sIHHIIHH4sI')
+
+# One whisper-cli stdout line → its text, minus any "[00:00.000 --> 00:02.000]"
+# prefix (in case a build ignores -nt) and surrounding whitespace
+_STDOUT_LINE_RE = re.compile(r'^[ \t]*(?:\[[^\]\n]*\][ \t]*)?(.+?)[ \t\r]*$', re.MULTILINE)
+# Text that is just one tag (e.g. "[BLANK_AUDIO]") or whitespace carries no speech
+_NON_SPEECH_RE = re.compile(r'\s*(?:\[[^\]]*\])?\s*')
+
+
+def _pin_to_whisper_cpus(pid: int = 0):
+    """
+    Restrict a thread/process (default: the caller) to WHISPER_CPU_SET
+    (Linux only). Children are pinned by pid right after spawning, not via
+    preexec_fn: that's unsafe in a threaded parent and forces a full fork.
+    ggml starts its threads after the model load, so they inherit the mask.
+    """
+    if WHISPER_CPU_SET and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(pid, WHISPER_CPU_SET)
+        except OSError:
+            pass  # cpuset changed under us: run unpinned rather than break the pool
+
+
+def _readahead(path: Path):
+    """Ask the kernel to start reading a model file into the page cache now."""
+    if not hasattr(os, "posix_fadvise"):
+        return  # macOS/Windows
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass  # Best effort — the load just reads it cold
+
+
+def _cuda_device_count() -> int:
+    """Number of CUDA devices CTranslate2 can see (0 without faster-whisper)."""
+    if FasterWhisperModel is None:
+        return 0
+    try:
+        return ctranslate2.get_cuda_device_count()
+    except Exception:
+        return 0
+
+
+def _resolve_backend() -> str:
+    """Turn TRANSCRIPTION_BACKEND into a concrete backend, failing fast on a bad pick."""
+    if TRANSCRIPTION_BACKEND not in _BACKENDS:
+        raise ValueError(
+            f"TRANSCRIPTION_BACKEND must be one of {_BACKENDS}, got {TRANSCRIPTION_BACKEND!r}"
+        )
+    if TRANSCRIPTION_BACKEND == "auto":
+        if _cuda_device_count() > 0:
+            return "faster_whisper"
+        if WhisperModel is not None:
+            return "whisper_cpp"
+        if httpx is not None and Path(WHISPER_SERVER_PATH).exists():
+            return "whisper_server"
+        return "whisper_cli"
+    if TRANSCRIPTION_BACKEND == "whisper_cpp" and WhisperModel is None:
+        raise ImportError("TRANSCRIPTION_BACKEND='whisper_cpp' needs: pip install pywhispercpp")
+    if TRANSCRIPTION_BACKEND == "faster_whisper" and FasterWhisperModel is None:
+        raise ImportError("TRANSCRIPTION_BACKEND='faster_whisper' needs: pip install faster-whisper")
+    if TRANSCRIPTION_BACKEND == "whisper_server" and httpx is None:
+        raise ImportError("TRANSCRIPTION_BACKEND='whisper_server' needs: pip install httpx")
+    return TRANSCRIPTION_BACKEND
+
 
 class WhisperTranscriber:
+    # Fixed attribute set (some only exist for the backend in use)
+    __slots__ = (
+        "whisper_path", "passive_model_path", "active_model_path",
+        "_backend", "_models", "_unload_task", "_executor", "_servers", "_clients",
+        "_device", "_compute_type", "_pcm_scratch_f32", "_wav_buf", "_pcm_scratch_i16",
+    )
+
     def __init__(self):
-        """Initialize whisper.cpp transcriber with passive + active models."""
+        """Initialize the transcriber with passive + active models."""
         self.whisper_path = Path(WHISPER_PATH)
         self.passive_model_path = Path(WHISPER_MODEL_PATH) / f"ggml-{WHISPER_PASSIVE_MODEL}.bin"
         self.active_model_path = Path(WHISPER_MODEL_PATH) / f"ggml-{WHISPER_ACTIVE_MODEL}.bin"
-
-        # Validate binary at startup — fail fast
+        self._backend = _resolve_backend()
+        # Resident in-process models, keyed by `active`. Only touched from the
+        # single whisper worker thread once __init__ returns
+        self._models: dict = {}
+        self._unload_task: Optional[asyncio.Task] = None
+        self._servers: dict[bool, subprocess.Popen] = {}
+        self._clients: dict = {}
+
+        if self._backend == "faster_whisper":
+            self._device = "cuda" if _cuda_device_count() > 0 else "cpu"
+            # fp16 only makes sense on the GPU; int8 is CTranslate2's fast CPU path
+            self._compute_type = FASTER_WHISPER_COMPUTE_TYPE if self._device == "cuda" else "int8"
+            print(f"[Whisper] Passive model: {FASTER_WHISPER_PASSIVE_MODEL}")
+            print(f"[Whisper] Active model:  {FASTER_WHISPER_ACTIVE_MODEL}")
+        else:
+            # Validate both models at startup
+            for label, model_name, model_path in [
+                ("Passive", WHISPER_PASSIVE_MODEL, self.passive_model_path),
+                ("Active", WHISPER_ACTIVE_MODEL, self.active_model_path),
+            ]:
+                if not model_path.exists():
+                    raise FileNotFoundError(
+                        f"{label} model not found at {model_path}\n"
+                        f"Download:\n"
+                        f"  cd whisper.cpp\n"
+                        f"  bash ./models/download-ggml-model.sh {model_name}"
+                    )
+
+            print(f"[Whisper] Passive model: {WHISPER_PASSIVE_MODEL} ({self.passive_model_path})")
+            print(f"[Whisper] Active model:  {WHISPER_ACTIVE_MODEL} ({self.active_model_path})")
+
+            # Readahead both files in parallel (async in the kernel): the
+            # active model streams in while the passive one loads, and the
+            # CLI/server backends start from a warm page cache
+            for model_path in (self.passive_model_path, self.active_model_path):
+                _readahead(model_path)
+        print(f"[Whisper] Threads: {WHISPER_THREADS}"
+              + (f" (pinned to CPUs {sorted(WHISPER_CPU_SET)})" if WHISPER_CPU_SET else ""))
+
+        # Preferred path: load both models once and keep them resident.
+        # Each whisper context is only ever used by one transcribe() at a time.
+        if self._backend in ("whisper_cpp", "faster_whisper"):
+            # One dedicated worker: serializes decodes (and model loads/unloads)
+            # and owns the CPU pinning, which ggml's compute threads inherit
+            # when whisper_full spawns them
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="whisper",
+                initializer=_pin_to_whisper_cpus
+            )
+            for active in (False, True):
+                self._models[active] = self._load_model(active)
+            if self._backend == "faster_whisper":
+                print(f"[Whisper] Backend: faster-whisper ({self._device}, {self._compute_type}), models loaded")
+            else:
+                print(f"[Whisper] Backend: in-process (pywhispercpp), models loaded")
+            return
+
+        # WAV encode scratch (server/CLI paths): the float32 stage and the
+        # WAV image itself, sized for the longest clip transcribe() accepts
+        max_samples = MAX_RECORDING_DURATION_S * SAMPLE_RATE
+        self._pcm_scratch_f32 = np.empty(max_samples, dtype=np.float32)
+        self._wav_buf = bytearray(_WAV_HEADER.size + max_samples * 2)
+        self._pcm_scratch_i16 = np.frombuffer(
+            self._wav_buf, dtype='<i2', offset=_WAV_HEADER.size
+        )
+
+        if self._backend == "whisper_server":
+            self._start_servers()
+            return
+
+        # Fallback: whisper-cli subprocess. Validate binary at startup — fail fast
         if not self.whisper_path.exists():
             raise FileNotFoundError(
                 f"whisper.cpp binary not found at {self.whisper_path}\n"
                 f"Build it:\n"
                 f"  cd whisper.cpp\n"
                 f"  cmake -B build\n"
-                f"  cmake --build build -j --config Release"
+                f"  cmake --build build -j --config Release\n"
+                f"Or install the in-process bindings: pip install pywhispercpp"
             )
+        print(f"[Whisper] Backend: subprocess (whisper-cli)")
+        print(f"[Whisper] Binary: {self.whisper_path}")
 
-        # Validate both models at startup
-        for label, model_name, model_path in [
-            ("Passive", WHISPER_PASSIVE_MODEL, self.passive_model_path),
-            ("Active", WHISPER_ACTIVE_MODEL, self.active_model_path),
-        ]:
-            if not model_path.exists():
-                raise FileNotFoundError(
-                    f"{label} model not found at {model_path}\n"
-                    f"Download:\n"
-                    f"  cd whisper.cpp\n"
-                    f"  bash ./models/download-ggml-model.sh {model_name}"
-                )
+    def _start_servers(self):
+        """
+        Launch one whisper-server per model and wait until both answer.
+        The models load once here; every utterance after that is one
+        loopback POST (no fork, no model reload).
+        """
+        if not Path(WHISPER_SERVER_PATH).exists():
+            raise FileNotFoundError(
+                f"whisper-server binary not found at {WHISPER_SERVER_PATH}\n"
+                f"Build it with whisper.cpp (cmake --build build -j --config Release)"
+            )
 
-        print(f"[Whisper] Passive model: {WHISPER_PASSIVE_MODEL} ({self.passive_model_path})")
-        print(f"[Whisper] Active model:  {WHISPER_ACTIVE_MODEL} ({self.active_model_path})")
-        print(f"[Whisper] Binary: {self.whisper_path}")
-        print(f"[Whisper] Threads: {WHISPER_THREADS}")
+        for active in (False, True):
+            self._spawn_server(active)
+            self._clients[active] = httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{WHISPER_SERVER_PORT + int(active)}", timeout=15.0
+            )
+        try:
+            for active in (False, True):
+                self._wait_for_server(active)
+        except RuntimeError:
+            self.close()
+            raise
+        print(f"[Whisper] Backend: whisper-server (ports {WHISPER_SERVER_PORT}-{WHISPER_SERVER_PORT + 1}), models loaded")
+
+    def _spawn_server(self, active: bool):
+        """Start the whisper-server for one model (passive: base port, active: +1)."""
+        self._servers[active] = subprocess.Popen(
+            [WHISPER_SERVER_PATH,
+             '-m', str(self.active_model_path if active else self.passive_model_path),
+             '-l', WHISPER_LANGUAGE,
+             '-t', str(WHISPER_THREADS),
+             '--host', '127.0.0.1',
+             '--port', str(WHISPER_SERVER_PORT + int(active))],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        _pin_to_whisper_cpus(self._servers[active].pid)
+
+    def _wait_for_server(self, active: bool, timeout_s: float = 60.0):
+        """Block until the server answers HTTP (the model is loaded by then)."""
+        process = self._servers[active]
+        url = str(self._clients[active].base_url)
+        deadline = time.monotonic() + timeout_s
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"whisper-server exited with code {process.returncode} during startup")
+            try:
+                urllib.request.urlopen(url, timeout=1.0).close()
+                return
+            except OSError:
+                time.sleep(0.1)
+        raise RuntimeError(f"whisper-server at {url} did not come up within {timeout_s:.0f}s")
+
+    def _respawn_server(self, active: bool):
+        """Replace a dead whisper-server (blocking — the model reloads)."""
+        print(f"[Whisper] {'Active' if active else 'Passive'} whisper-server exited "
+              f"(code {self._servers[active].returncode}), restarting...")
+        self._spawn_server(active)
+        self._wait_for_server(active)
+        print(f"[Whisper] whisper-server restarted")
+
+    def close(self):
+        """Stop the whisper-server processes (no-op for the other backends)."""
+        for process in self._servers.values():
+            if process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+        self._servers.clear()
+
+    async def aclose(self):
+        """close(), plus the whisper-server HTTP clients' connection pools."""
+        self.close()
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    async def warm_up(self):
+        """
+        Run one dummy decode per model (0.3s of silence) so the first real
+        utterance doesn't pay for page faults, compute-buffer allocation and
+        (whisper-server) first-request setup. Call once the event loop is up.
+        """
+        print(f"[Whisper] Warming up models...")
+        silence = np.zeros(int(0.3 * SAMPLE_RATE), dtype=np.float32)
+        for active in (False, True):
+            await self.transcribe(silence, active=active)
+        # The active model is resident now; let it idle out like after a command
+        self._schedule_active_unload()
+        print(f"[Whisper] Warm-up complete")
+
+    def _load_model(self, active: bool):
+        """Construct the in-process model for one mode (blocking)."""
+        if self._backend == "faster_whisper":
+            return FasterWhisperModel(
+                FASTER_WHISPER_ACTIVE_MODEL if active else FASTER_WHISPER_PASSIVE_MODEL,
+                device=self._device, compute_type=self._compute_type,
+                cpu_threads=WHISPER_THREADS,
+            )
+        return WhisperModel(
+            str(self.active_model_path if active else self.passive_model_path),
+            redirect_whispercpp_logs_to=None,  # Silence ggml load logs
+            n_threads=WHISPER_THREADS,
+            language=WHISPER_LANGUAGE,
+            print_progress=False,
+            print_realtime=False,
+        )
+
+    def _ensure_model(self, active: bool):
+        """Return the resident model, (re)loading it if it was unloaded (worker thread)."""
+        model = self._models.get(active)
+        if model is None:
+            print(f"[Whisper] Loading {'active' if active else 'passive'} model...")
+            model = self._models[active] = self._load_model(active)
+        return model
+
+    def _unload_active_model(self):
+        """Drop the large active model to free its RAM (worker thread)."""
+        if self._models.pop(True, None) is not None:
+            print(f"[Whisper] Active model idle for {WHISPER_ACTIVE_IDLE_UNLOAD_S}s, unloaded")
+
+    def _schedule_active_unload(self):
+        """(Re)start the idle timer that unloads the active model."""
+        if WHISPER_ACTIVE_IDLE_UNLOAD_S is None or self._backend not in _IN_PROCESS:
+            return
+        if self._unload_task and not self._unload_task.done():
+            self._unload_task.cancel()
+        self._unload_task = asyncio.create_task(self._unload_after_idle())
+
+    async def _unload_after_idle(self):
+        try:
+            await asyncio.sleep(WHISPER_ACTIVE_IDLE_UNLOAD_S)
+            # Via the worker, so it can't pull the model out from under a decode
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._unload_active_model
+            )
+        except asyncio.CancelledError:
+            pass  # Active model used again before the timer ran out
+
+    async def prewarm_active(self):
+        """
+        Make sure the active model is resident before the command arrives.
+        Called on PASSIVE → ACTIVE so a reload (if it was unloaded) overlaps
+        with the user speaking the command.
+        """
+        if self._backend not in _IN_PROCESS:
+            return  # whisper-cli loads per call; whisper-server keeps its own
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._ensure_model, True
+            )
+        except Exception as e:
+            print(f"[Whisper] ERROR: Failed to load active model: {e}")
+            return
+        self._schedule_active_unload()
+
+    async def transcribe_passive(self, audio: np.ndarray) -> Optional[str]:
+        """Transcribe with the lightweight passive model (wake word detection)."""
+        return await self.transcribe(audio, active=False)
+
+    async def transcribe_active(self, audio: np.ndarray) -> Optional[str]:
+        """Transcribe with the high-quality active model (commands)."""
+        try:
+            return await self.transcribe(audio, active=True)
+        finally:
+            self._schedule_active_unload()
 
     async def transcribe(self, audio: np.ndarray, active: bool = False) -> Optional[str]:
         """
         Transcribe audio using whisper.cpp.
 
         Args:
-            audio: numpy array of audio samples (16kHz, mono, float32, range [-1, 1])
+            audio: numpy array of audio samples (16kHz, mono, float32 in [-1, 1]
+                   or int16 PCM — see AUDIO_DTYPE)
             active: if True, use the high-quality active model (for commands);
                     if False, use the lightweight passive model (for wake word)
 
@@ -86,59 +427,138 @@ class WhisperTranscriber:
             duration_s = MAX_RECORDING_DURATION_S
 
         model_path = self.active_model_path if active else self.passive_model_path
-        model_label = "active/turbo" if active else "passive/base"
+        model_label = "active/turbo" if active else "passive/tiny"
         print(f"[Whisper] Transcribing {duration_s:.1f}s of audio ({model_label})...")
 
-        # We need two temp files:
-        #   1. WAV input (whisper-cli needs a file, no stdin WAV support)
-        #   2. TXT output (we use --output-file to get clean text, no stdout parsing)
-        tmp_wav = None
-        tmp_out = None
+        if self._backend in _IN_PROCESS:
+            try:
+                # whisper_full blocks for the whole decode — keep it off the event loop
+                return await asyncio.get_running_loop().run_in_executor(
+                    self._executor, self._transcribe_in_process, audio, active
+                )
+            except Exception as e:
+                print(f"[Whisper] ERROR: {e}")
+                return None
 
-        try:
-            # Write audio to temp WAV
-            tmp_wav = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-            tmp_wav_path = tmp_wav.name
-            tmp_wav.close()  # Close so whisper-cli can read it
-
-            audio_int16 = (audio * 32767).astype(np.int16)
-            with wave.open(tmp_wav_path, 'wb') as wav_file:
-                wav_file.setnchannels(CHANNELS)
-                wav_file.setsampwidth(2)  # 16-bit
-                wav_file.setframerate(SAMPLE_RATE)
-                wav_file.writeframes(audio_int16.tobytes())
-
-            # Prepare output path (whisper-cli appends .txt to --output-file value)
-            tmp_out = tempfile.NamedTemporaryFile(suffix='', delete=False)
-            tmp_out_base = tmp_out.name
-            tmp_out.close()
-            tmp_out_txt = tmp_out_base + ".txt"
-
-            # Run whisper-cli
-            text = await self._run_whisper(tmp_wav_path, tmp_out_base, model_path, active)
-            return text
+        if self._backend == "whisper_server":
+            try:
+                return await self._transcribe_server(self._encode_wav(audio), active)
+            except Exception as e:
+                print(f"[Whisper] ERROR: {e}")
+                return None
 
+        # whisper-cli reads the WAV from stdin (-f -) and prints the text to
+        # stdout (-nt) — no temp files in either direction
+        try:
+            return await self._run_whisper(self._encode_wav(audio), model_path, active)
         except Exception as e:
             print(f"[Whisper] ERROR: {e}")
             return None
 
-        finally:
-            # Clean up all temp files
-            for path in [tmp_wav_path if tmp_wav else None,
-                         tmp_out_base if tmp_out else None,
-                         tmp_out_base + ".txt" if tmp_out else None]:
-                if path:
-                    try:
-                        os.unlink(path)
-                    except OSError:
-                        pass
-
-    async def _run_whisper(self, audio_path: str, output_base: str, model_path: Path, active: bool = False) -> Optional[str]:
+    def _encode_wav(self, audio: np.ndarray) -> bytes:
+        """
+        Encode float32 audio as an in-memory 16-bit PCM WAV.
+
+        The 44-byte RIFF header is packed by hand and the samples scaled,
+        clipped (avoids int16 wraparound on full-scale peaks) and cast
+        inside reused scratch buffers — the WAV image is assembled in place
+        and the returned bytes are its only copy. Synchronous, so concurrent
+        transcribe() calls can't interleave on the scratch.
+        """
+        n = len(audio)
+        if audio.dtype == np.int16:
+            self._pcm_scratch_i16[:n] = audio  # int16 capture: already PCM
+        else:
+            f32 = self._pcm_scratch_f32[:n]
+            np.multiply(audio, 32767.0, out=f32)
+            np.clip(f32, -32768, 32767, out=f32)
+            self._pcm_scratch_i16[:n] = f32
+
+        data_size = n * 2
+        block_align = CHANNELS * 2  # 16-bit
+        _WAV_HEADER.pack_into(
+            self._wav_buf, 0,
+            b'RIFF', 36 + data_size, b'WAVE',
+            b'fmt ', 16, 1, CHANNELS, SAMPLE_RATE,  # PCM format chunk
+            SAMPLE_RATE * block_align, block_align, 16,
+            b'data', data_size
+        )
+        return bytes(memoryview(self._wav_buf)[:_WAV_HEADER.size + data_size])
+
+    def _transcribe_in_process(self, audio: np.ndarray, active: bool) -> Optional[str]:
+        """
+        Run the resident model (blocking — runs on self._executor).
+
+        The float32 samples are handed to whisper.cpp / faster-whisper as-is;
+        no WAV encode, temp file, or int16 round-trip. Passive mode gets the
+        same wake word prompt conditioning as the subprocess path.
+        """
+        model = self._ensure_model(active)
+        params = {}
+        if not active and WAKE_WORDS:
+            params["initial_prompt"] = ", ".join(WAKE_WORDS)
+
+        if audio.dtype == np.int16:
+            audio = audio * np.float32(1.0 / 32768.0)  # int16 capture (AUDIO_DTYPE)
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        if self._backend == "faster_whisper":
+            # Greedy decoding; segments is a lazy generator, consumed below.
+            # vad_filter off — the utterance was already cut by our VAD
+            segments, _ = model.transcribe(
+                audio, language=WHISPER_LANGUAGE, beam_size=1, vad_filter=False, **params
+            )
+        else:
+            segments = model.transcribe(audio, **params)
+        text = " ".join(seg.text.strip() for seg in segments).strip()
+
+        if text:
+            print(f"[Whisper] Transcribed: '{text}'")
+            return text
+        print(f"[Whisper] Empty transcription")
+        return None
+
+    async def _transcribe_server(self, wav_bytes: bytes, active: bool) -> Optional[str]:
+        """POST the in-memory WAV to the model's whisper-server /inference endpoint."""
+        data = {"response_format": "text", "temperature": "0.0"}
+        # Same wake word conditioning as the other backends
+        if not active and WAKE_WORDS:
+            data["prompt"] = ", ".join(WAKE_WORDS)
+
+        for attempt in range(2):
+            try:
+                response = await self._clients[active].post(
+                    "/inference", data=data,
+                    files={"file": ("audio.wav", wav_bytes, "audio/wav")}
+                )
+                break
+            except httpx.TimeoutException:
+                print(f"[Whisper] ERROR: Transcription timeout (>15s)")
+                return None
+            except httpx.TransportError:
+                # Keep the worker alive: a crashed server is restarted and the
+                # request retried once, instead of failing every later utterance
+                if attempt or self._servers[active].poll() is None:
+                    raise
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._respawn_server, active
+                )
+        if response.status_code != 200:
+            print(f"[Whisper] Server returned {response.status_code}: {response.text[:500]}")
+            return None
+
+        text = response.text.strip()
+        if text:
+            print(f"[Whisper] Transcribed: '{text}'")
+            return text
+        print(f"[Whisper] Empty transcription")
+        return None
+
+    async def _run_whisper(self, wav_bytes: bytes, model_path: Path, active: bool = False) -> Optional[str]:
         """
         Run whisper.cpp binary and return transcribed text.
 
-        Strategy: Use -otxt --output-file to write clean text to a file.
-        This avoids all stdout parsing issues (timestamps, color codes, etc).
+        Strategy: -nt prints bare segment text to stdout and --no-prints keeps
+        progress/debug off it, so stdout is the transcript.
 
         In passive mode, uses --prompt to condition the decoder on the wake word,
         making it significantly more likely to correctly transcribe "hey fox"
@@ -147,12 +567,11 @@ class WhisperTranscriber:
         cmd = [
             str(self.whisper_path),
             '-m', str(model_path),
-            '-f', audio_path,
+            '-f', '-',                       # WAV piped over stdin
             '-l', WHISPER_LANGUAGE,
             '-t', str(WHISPER_THREADS),
-            '-otxt',                         # Output as .txt file
-            '--output-file', output_base,    # Write to this path (+ .txt appended)
-            '--no-prints',                   # Suppress progress/debug to stderr
+            '-nt',                           # No timestamps: stdout is plain text
+            '--no-prints',                   # Suppress progress/debug output
         ]
 
         # In passive mode, condition the decoder on the wake word.
@@ -167,12 +586,14 @@ class WhisperTranscriber:
         try:
             process = await asyncio.create_subprocess_exec(
                 *cmd,
+                stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stderr=asyncio.subprocess.PIPE,
             )
+            _pin_to_whisper_cpus(process.pid)
 
             stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
+                process.communicate(input=wav_bytes),
                 timeout=15.0  # generous timeout for longer audio
             )
 
@@ -182,16 +603,7 @@ class WhisperTranscriber:
                     print(f"[Whisper] stderr: {stderr.decode('utf-8', errors='replace')[:500]}")
                 return None
 
-            # Read the clean text output file
-            output_txt_path = output_base + ".txt"
-            if not os.path.exists(output_txt_path):
-                print(f"[Whisper] Output file not created: {output_txt_path}")
-                # Fallback: try parsing stdout
-                return self._parse_stdout(stdout.decode('utf-8', errors='replace'))
-
-            with open(output_txt_path, 'r', encoding='utf-8') as f:
-                text = f.read().strip()
-
+            text = self._parse_stdout(stdout.decode('utf-8', errors='replace'))
             if text:
                 print(f"[Whisper] Transcribed: '{text}'")
                 return text
@@ -208,25 +620,7 @@ class WhisperTranscriber:
 
     @staticmethod
     def _parse_stdout(output: str) -> Optional[str]:
-        """
-        Fallback: parse whisper-cli stdout if file output failed.
-        Handles both timestamped and plain output formats.
-        """
-        lines = output.strip().split('\n')
-        text_parts = []
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            # Strip timestamp prefix like "[00:00:00.000 --> 00:00:02.000]"
-            if line.startswith('[') and ']' in line:
-                _, _, remainder = line.partition(']')
-                line = remainder.strip()
-
-            if line:
-                text_parts.append(line)
-
-        text = ' '.join(text_parts).strip()
-        return text if text else None
\ No newline at end of file
+        """Join whisper-cli's stdout lines in one regex pass (timestamps tolerated)."""
+        return ' '.join(
+            p for p in _STDOUT_LINE_RE.findall(output) if not _NON_SPEECH_RE.fullmatch(p)
+        ) or None
@@ -4,36 +4,396 @@ Lightweight, CPU-only, highly accurate speech detection.
 
 CRITICAL: Silero VAD streaming requires chunks of exactly 512, 1024, or 1536
 samples at 16kHz. The audio callback blocksize MUST match VAD_CHUNK_SAMPLES.
+
+Runs the Silero ONNX export on ONNX Runtime when available (single-threaded,
+fixed-shape input — no PyTorch dispatch per chunk); otherwise falls back to
+the torch.hub JIT model. torch is only imported for that fallback.
+
+process_chunk_async runs the detector on its own worker thread, so a slow
+inference (the torch path takes milliseconds) never stalls the event loop.
+It logs through the "vad" logger (level VAD_LOG_LEVEL) instead of print.
 """
 
-import torch
+import asyncio
+import logging
+import os
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Optional
 from config import (
     SAMPLE_RATE, VAD_THRESHOLD, VAD_MIN_SPEECH_DURATION_MS,
     VAD_PASSIVE_SILENCE_MS, VAD_ACTIVE_SILENCE_MS, VAD_CHUNK_DURATION_MS,
-    MAX_AUDIO_BUFFER_FRAMES
+    VAD_CHUNK_SAMPLES, VAD_ONNX_PATH, VAD_ONNX_INT8, MAX_AUDIO_BUFFER_FRAMES,
+    VAD_GATE_RATIO, VAD_NOISE_FLOOR_ALPHA, VAD_GATE_REFRESH_CHUNKS,
+    VAD_BATCH_CHUNKS, VAD_ACTIVE_BATCH_CHUNKS, VAD_SPEECH_PAD_MS, AUDIO_DTYPE, AUDIO_CPU
 )
 
+# Handler/level set up by server.main (VAD_LOG_LEVEL); %-style args so
+# filtered-out messages are never formatted on the VAD thread
+logger = logging.getLogger("vad")
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None  # Fall back to the PyTorch model
+
+# Imported by _SileroTorch on first use: the ONNX path never pays torch's
+# ~1s import and few hundred MB of RSS
+torch = None
+
+
+def _pin_to_audio_cpu():
+    """Executor initializer: keep the VAD worker on the core whisper stays off."""
+    if AUDIO_CPU is not None and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, {AUDIO_CPU})
+        except OSError:
+            pass
+
+
+# Silero v5 prepends the tail of the previous chunk to each 16kHz chunk
+_CONTEXT_SAMPLES = 64
+
+# int16 capture (AUDIO_DTYPE) → Silero's [-1, 1) float input
+_INT16_SCALE = np.float32(1.0 / 32768.0)
+
+
+def _load_float32(dst: np.ndarray, audio: np.ndarray):
+    """Write audio into a float32 buffer, scaling int16 in the same pass."""
+    if audio.dtype == np.int16:
+        np.multiply(audio, _INT16_SCALE, out=dst)
+    else:
+        dst[...] = audio
+
+
+def _has_int8_dot() -> bool:
+    """CPU has int8 dot-product instructions (ARM asimddp/i8mm, x86 VNNI)."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith(("flags", "Features")):
+                    flags = set(line.split(":", 1)[1].split())
+                    return bool(flags & {"asimddp", "i8mm", "avx512_vnni", "avx_vnni"})
+    except OSError:
+        pass
+    return False
+
+
+def _use_int8() -> bool:
+    """Resolve VAD_ONNX_INT8 ("auto" → only where int8 kernels pay off)."""
+    if VAD_ONNX_INT8 == "auto":
+        return _has_int8_dot()
+    return bool(VAD_ONNX_INT8)
+
+
+# Ops quantize_dynamic emits when it actually rewrites something
+_QUANTIZED_OPS = {"DynamicQuantizeLinear", "MatMulInteger", "ConvInteger", "DynamicQuantizeLSTM"}
+
+
+def _has_quantized_ops(path: str) -> bool:
+    """Whether the ONNX model (If/Loop subgraphs included) contains int8 ops."""
+    import onnx
+
+    def walk(graph) -> bool:
+        for node in graph.node:
+            if node.op_type in _QUANTIZED_OPS or node.op_type.startswith("QLinear"):
+                return True
+            for attr in node.attribute:
+                subgraphs = list(attr.graphs) + ([attr.g] if attr.HasField("g") else [])
+                if any(walk(g) for g in subgraphs):
+                    return True
+        return False
+
+    return walk(onnx.load(path).graph)
+
+
+def _int8_model_path(path: str) -> str:
+    """
+    Return a dynamically INT8-quantized copy of the ONNX model, building it
+    next to the original on first use. Falls back to the FP32 model if the
+    quantization tooling (needs the `onnx` package) isn't available, fails,
+    or leaves the model without any int8 ops — the stock Silero v5 export
+    keeps its weights as Constant nodes inside If subgraphs, which
+    quantize_dynamic doesn't touch.
+    """
+    src = Path(path)
+    dst = src.with_name(f"{src.stem}_int8{src.suffix}")
+    try:
+        if not dst.exists():
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            quantize_dynamic(str(src), str(dst), weight_type=QuantType.QInt8)
+        if not _has_quantized_ops(str(dst)):
+            logger.info("INT8: nothing in %s is quantizable, using FP32 model", src)
+            return path
+        logger.info("Using INT8 model: %s", dst)
+        return str(dst)
+    except Exception as e:
+        logger.warning("INT8 quantization failed (%s), using FP32 model", e)
+        return path
+
+
+class _SileroOnnx:
+    """
+    Streaming Silero on ONNX Runtime: fixed 512-sample chunks.
+
+    Handles both exports: v5 (one `state` tensor, 64-sample context prepended
+    to each chunk) and v4 (separate `h`/`c` LSTM states, bare chunks). The
+    layout is picked from the model's input names.
+    """
+
+    def __init__(self, path: str, batch_size: int = 1):
+        opts = ort.SessionOptions()
+        # One 0.1ms inference per chunk — spinning up intra-op threads costs more than it saves
+        opts.intra_op_num_threads = 1
+        opts.inter_op_num_threads = 1
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        # No busy-waiting between chunks: the next one is 32ms away, and a
+        # spinning pool thread would burn a core whisper could use
+        opts.add_session_config_entry("session.intra_op.allow_spinning", "0")
+        opts.add_session_config_entry("session.inter_op.allow_spinning", "0")
+        self._sess = ort.InferenceSession(
+            path, sess_options=opts, providers=["CPUExecutionProvider"]
+        )
+
+        # (input name, output name, shape) of each recurrent state tensor
+        if "h" in {i.name for i in self._sess.get_inputs()}:
+            states = [("h", "hn", (2, 1, 64)), ("c", "cn", (2, 1, 64))]
+            self._context = 0
+        else:
+            states = [("state", "stateN", (2, 1, 128))]
+            self._context = _CONTEXT_SAMPLES
+
+        # LSTM state(s) + [context | chunk] input, reused across calls
+        self._states = {name: np.zeros(shape, dtype=np.float32) for name, _, shape in states}
+        self._state_out = {name: np.zeros(shape, dtype=np.float32) for name, _, shape in states}
+        self._state_names = [(name, out) for name, out, _ in states]
+        self._input = np.zeros((1, self._context + VAD_CHUNK_SAMPLES), dtype=np.float32)
+        self._sr = np.array(SAMPLE_RATE, dtype=np.int64)
+        self._prob = np.zeros((1, 1), dtype=np.float32)
+
+        # Bind the buffers above once (OrtValues share their memory), so a
+        # streaming call allocates no tensors: copy the chunk in, run, read out
+        self._io = self._sess.io_binding()
+        inputs = [("input", self._input), ("sr", self._sr)] + list(self._states.items())
+        outputs = [("output", self._prob)] + [(out, self._state_out[name]) for name, out in self._state_names]
+        for name, buf in inputs:
+            self._io.bind_ortvalue_input(name, ort.OrtValue.ortvalue_from_numpy(buf))
+        for name, buf in outputs:
+            self._io.bind_ortvalue_output(name, ort.OrtValue.ortvalue_from_numpy(buf))
+        self._batch_input = np.zeros(
+            (batch_size, self._context + VAD_CHUNK_SAMPLES), dtype=np.float32
+        )
+
+    def __call__(self, audio_chunk: np.ndarray) -> float:
+        """Return the speech probability for one chunk."""
+        ctx = self._context
+        _load_float32(self._input[0, ctx:], audio_chunk)
+        self._sess.run_with_iobinding(self._io)
+        for name, buf in self._states.items():
+            np.copyto(buf, self._state_out[name])
+        if ctx:
+            # Tail of this chunk is the context for the next one
+            self._input[0, :ctx] = self._input[0, -ctx:]
+        return float(self._prob[0, 0])
+
+    def run_batch(self, chunks: np.ndarray) -> np.ndarray:
+        """
+        Speech probabilities for consecutive chunks in ONE session.run.
+
+        Each row gets its exact context (v5), but all rows start from the
+        same LSTM state (the state after the previous batch) — Silero's
+        batch axis is independent streams, so within-batch recurrence is
+        approximated. The last row's output state carries forward.
+        """
+        ctx = self._context
+        inp = self._batch_input[:len(chunks)]
+        _load_float32(inp[:, ctx:], chunks)
+        if ctx:
+            inp[0, :ctx] = self._input[0, :ctx]
+            inp[1:, :ctx] = inp[:-1, -ctx:]
+
+        feed = {"input": inp, "sr": self._sr}
+        for name, buf in self._states.items():
+            feed[name] = np.repeat(buf, len(chunks), axis=1)
+        probs, *states_out = self._sess.run(
+            ["output"] + [out for _, out in self._state_names], feed
+        )
+
+        for buf, state in zip(self._states.values(), states_out):
+            np.copyto(buf, state[:, -1:, :])
+        if ctx:
+            self._input[0, :ctx] = inp[-1, -ctx:]
+        return probs[:, 0]
+
+    def reset_states(self):
+        # In place — these buffers are bound to the session
+        for buf in self._states.values():
+            buf.fill(0.0)
+        self._input.fill(0.0)
+
+
+class _SileroTorch:
+    """Silero JIT model from torch.hub (fallback when ONNX Runtime is missing)."""
+
+    def __init__(self, batch_size: int = 1):
+        global torch
+        try:
+            import torch
+        except ImportError:
+            raise ImportError(
+                f"Silero VAD needs either onnxruntime + {VAD_ONNX_PATH} "
+                f"(run setup.sh) or PyTorch for the torch.hub fallback (pip install torch)"
+            ) from None
+
+        # The LSTM is far too small to benefit from intra-op threads, and
+        # extra ones would fight whisper.cpp for cores
+        torch.set_num_threads(1)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass  # Only settable before torch's first parallel work
 
-class VADDetector:
-    def __init__(self):
-        """Initialize Silero VAD model."""
         # Load pre-trained Silero VAD
-        self.model, utils = torch.hub.load(
+        self._model, utils = torch.hub.load(
             repo_or_dir='snakers4/silero-vad',
             model='silero_vad',
             force_reload=False,
             onnx=False
         )
 
-        self.model.eval()
+        self._model.eval()
+        if VAD_ONNX_INT8 is True:
+            # quantize_dynamic only rewrites nn.Linear/nn.LSTM, and the hub
+            # model is TorchScript built from Conv1d + LSTMCell — nothing to quantize
+            logger.warning("INT8 is ONNX-only, torch fallback runs FP32")
+
+        # The v5 wrapper's stateless 16 kHz core, (context|chunk, state) →
+        # (prob, state). Single chunks and batches both drive it directly with
+        # one shared state, so each row gets its exact context; older hub
+        # models lack it
+        self._core = getattr(self._model, "_model", None)
+
+        # Freeze: weights become graph constants (no attribute lookups per
+        # call) and optimize_for_inference folds/fuses what it can. The core
+        # is taken first — freezing inlines the wrapper's submodules
+        try:
+            self._model = torch.jit.optimize_for_inference(
+                torch.jit.freeze(self._model, preserved_attrs=["reset_states"])
+            )
+            if self._core is not None:
+                self._core = torch.jit.optimize_for_inference(torch.jit.freeze(self._core))
+        except (RuntimeError, AttributeError) as e:
+            logger.warning("TorchScript freeze failed (%s), running unfrozen", e)
+        # One LSTM state + 64-sample context for single chunks AND batches,
+        # as in the ONNX backend: per-mode batch sizes switch between the two
+        # mid-stream, and neither may restart from a stale or zeroed state
+        self._state = torch.zeros(2, 1, 128)
+        self._context = np.zeros(_CONTEXT_SAMPLES, dtype=np.float32)
+
+        # Persistent float32 inputs, filled through their numpy views (int16
+        # scaled in the same pass) — no tensor allocated or cast per call.
+        # Rows are [context | chunk]; _input only feeds the wrapper (no core)
+        self._input = torch.zeros(VAD_CHUNK_SAMPLES)
+        self._input_np = self._input.numpy()
+        self._batch_input = torch.zeros(
+            max(1, batch_size), _CONTEXT_SAMPLES + VAD_CHUNK_SAMPLES
+        )
+        self._batch_input_np = self._batch_input.numpy()
+
+    def __call__(self, audio_chunk: np.ndarray) -> float:
+        """Return the speech probability for one chunk."""
+        if self._core is not None:
+            return float(self._run_core(audio_chunk[None, :])[0])
+
+        # Older hub models: the wrapper keeps its own state (batches loop here too)
+        _load_float32(self._input_np, audio_chunk)
+        with torch.no_grad():
+            # .item() then a float compare: on CPU there is no device sync to
+            # save, and bool(prob.gt(VAD_THRESHOLD)) costs ~12× more (an extra op)
+            return self._model(self._input, SAMPLE_RATE).item()
+
+    def run_batch(self, chunks: np.ndarray) -> np.ndarray:
+        """
+        Speech probabilities for consecutive chunks in ONE forward pass —
+        one round of TorchScript dispatch for the batch instead of per chunk.
+        Same approximation as the ONNX backend: exact per-row contexts, the
+        previous batch's LSTM state shared by every row.
+        """
+        if self._core is None:
+            return np.array([self(chunk) for chunk in chunks])
+        return self._run_core(chunks)
+
+    def _run_core(self, chunks: np.ndarray) -> np.ndarray:
+        """Run the stateless core on consecutive chunks, carrying _state/_context."""
+        n = len(chunks)
+        inp = self._batch_input_np[:n]
+        _load_float32(inp[:, _CONTEXT_SAMPLES:], chunks)
+        inp[0, :_CONTEXT_SAMPLES] = self._context
+        inp[1:, :_CONTEXT_SAMPLES] = inp[:-1, -_CONTEXT_SAMPLES:]
+        state = self._state if n == 1 else self._state.repeat(1, n, 1)
+        with torch.no_grad():
+            probs, state = self._core(self._batch_input[:n], state)
+
+        self._state = state[:, -1:, :].clone()
+        self._context[:] = inp[-1, -_CONTEXT_SAMPLES:]
+        return probs[:, 0].numpy()
+
+    def reset_states(self):
+        self._model.reset_states()
+        self._state.zero_()
+        self._context.fill(0.0)
+
+
+class VADDetector:
+    # Fixed attribute set: process_chunk touches several of these per 32ms chunk
+    __slots__ = (
+        "model", "_vad_exec",
+        "speech_started", "silence_frames", "_frame_buf", "_n_frames",
+        "_noise_floor", "_chunks_since_silero", "_batch", "_n_pending",
+        "_batch_size", "min_speech_frames", "min_silence_frames",
+        "_passive_silence_frames", "_active_silence_frames", "_pad_frames",
+        "_lookback", "_lookback_pos", "_lookback_count", "_onset_frames", "_handlers",
+    )
+
+    def __init__(self):
+        """Initialize Silero VAD model."""
+        # Batch buffers are sized for whichever mode batches more
+        max_batch = max(VAD_BATCH_CHUNKS, VAD_ACTIVE_BATCH_CHUNKS)
+        if ort is not None and Path(VAD_ONNX_PATH).exists():
+            onnx_path = _int8_model_path(VAD_ONNX_PATH) if _use_int8() else VAD_ONNX_PATH
+            self.model = _SileroOnnx(onnx_path, batch_size=max_batch)
+            backend = f"onnxruntime ({onnx_path})"
+        else:
+            self.model = _SileroTorch(batch_size=max_batch)
+            backend = "torch"
+
+        # All detector state is touched from this one worker (see process_chunk_async),
+        # pinned next to the audio callback so whisper decodes can't starve it
+        self._vad_exec = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="vad", initializer=_pin_to_audio_cpu
+        )
 
         # State tracking
         self.speech_started = False
-        self.speech_frames: list[np.ndarray] = []
         self.silence_frames = 0
 
+        # Utterance audio, written chunk by chunk in place (no per-chunk copies
+        # into a list, no concatenate of scattered frames at utterance end)
+        self._frame_buf = np.empty((MAX_AUDIO_BUFFER_FRAMES, VAD_CHUNK_SAMPLES), dtype=AUDIO_DTYPE)
+        self._n_frames = 0
+
+        # Energy pre-gate state (adaptive background level, Silero skip counter)
+        self._noise_floor = 0.0
+        self._chunks_since_silero = 0
+
+        # Tumbling batch: chunks wait here until _batch_size have arrived
+        # (per mode, see set_mode)
+        self._batch = np.empty((max_batch, VAD_CHUNK_SAMPLES), dtype=AUDIO_DTYPE)
+        self._n_pending = 0
+        self._batch_size = VAD_BATCH_CHUNKS
+
         # Pre-compute frame counts from ms durations
         self.min_speech_frames = max(1, int(
             VAD_MIN_SPEECH_DURATION_MS / VAD_CHUNK_DURATION_MS
@@ -50,11 +410,32 @@ class VADDetector:
         # Start in passive mode (shorter silence timeout for wake word detection)
         self.min_silence_frames = self._passive_silence_frames
 
-        print(f"[VAD] Initialized (threshold={VAD_THRESHOLD}, "
-              f"chunk={VAD_CHUNK_DURATION_MS}ms, "
-              f"min_speech={self.min_speech_frames} frames, "
-              f"passive_silence={self._passive_silence_frames} frames, "
-              f"active_silence={self._active_silence_frames} frames)")
+        # Silence chunks kept per pause: the rest are counted but never stored,
+        # so long active-mode pauses don't pad the utterance whisper decodes
+        self._pad_frames = max(1, int(VAD_SPEECH_PAD_MS / VAD_CHUNK_DURATION_MS))
+
+        # Pre-speech lookback: the onset chunks plus up to VAD_SPEECH_PAD_MS of
+        # lead-in, so the first syllable isn't clipped. Fixed ring, never grows
+        self._lookback = np.empty(
+            (self.min_speech_frames + self._pad_frames, VAD_CHUNK_SAMPLES), dtype=AUDIO_DTYPE
+        )
+        self._lookback_pos = 0
+        self._lookback_count = 0
+        self._onset_frames = 0
+
+        # _update dispatch, indexed by (speech_started << 1) | is_speech:
+        # bound once here, so each chunk is one tuple index + one call
+        self._handlers = (
+            self._on_idle_silence, self._on_idle_speech, self._on_silence, self._on_speech
+        )
+
+        logger.info("Initialized (%s, threshold=%s, chunk=%dms, batch=%d/%d (passive/active), "
+                    "min_speech=%d frames, pad=%d frames, passive_silence=%d frames, "
+                    "active_silence=%d frames)",
+                    backend, VAD_THRESHOLD, VAD_CHUNK_DURATION_MS,
+                    VAD_BATCH_CHUNKS, VAD_ACTIVE_BATCH_CHUNKS,
+                    self.min_speech_frames, self._pad_frames,
+                    self._passive_silence_frames, self._active_silence_frames)
 
     def set_mode(self, mode: str):
         """
@@ -65,11 +446,20 @@ class VADDetector:
         """
         if mode == "passive":
             self.min_silence_frames = self._passive_silence_frames
+            self._batch_size = VAD_BATCH_CHUNKS
         elif mode == "active":
             self.min_silence_frames = self._active_silence_frames
+            self._batch_size = VAD_ACTIVE_BATCH_CHUNKS
         else:
             raise ValueError(f"Unknown VAD mode: {mode}")
-        print(f"[VAD] Mode → {mode} (silence={self.min_silence_frames} frames)")
+        logger.info("Mode → %s (silence=%d frames, batch=%d)",
+                    mode, self.min_silence_frames, self._batch_size)
+
+    async def process_chunk_async(self, audio_chunk: np.ndarray) -> tuple[bool, Optional[np.ndarray]]:
+        """process_chunk on the VAD worker thread, keeping the event loop free."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._vad_exec, self.process_chunk, audio_chunk
+        )
 
     def process_chunk(self, audio_chunk: np.ndarray) -> tuple[bool, Optional[np.ndarray]]:
         """
@@ -77,69 +467,173 @@ class VADDetector:
 
         Args:
             audio_chunk: numpy array, must be exactly VAD_CHUNK_SAMPLES long
+                         (only read during the call — may be a reused buffer)
 
         Returns:
             is_speech: True if current chunk contains speech
             completed_utterance: Full audio array if utterance ended, else None
         """
-        # Convert to torch tensor (float32, range [-1, 1])
-        audio_tensor = torch.from_numpy(audio_chunk).float()
+        # Chunks still pending from a batched mode are flushed through the batch path
+        if self._batch_size > 1 or self._n_pending:
+            return self._process_batched(audio_chunk)
 
-        # Get VAD prediction
-        with torch.no_grad():
-            speech_prob = self.model(audio_tensor, SAMPLE_RATE).item()
+        # Squares in float32 (int16 would overflow); RMS is in capture units,
+        # which the adaptive noise floor shares, so the gate ratio is unaffected
+        rms = float(np.sqrt(np.mean(np.square(audio_chunk, dtype=np.float32))))
 
-        is_speech = speech_prob > VAD_THRESHOLD
+        # Outside an utterance, obvious background silence never reaches Silero.
+        # Inside one — or once an onset has begun — we always ask Silero, so
+        # quiet speech can't end it early or be starved of consecutive frames.
+        ran_silero = (self.speech_started or self._onset_frames > 0
+                      or self._passes_energy_gate(rms))
+        speech_prob = self.model(audio_chunk) if ran_silero else 0.0  # Get VAD prediction
 
-        if is_speech:
-            self.speech_frames.append(audio_chunk)
-            self.silence_frames = 0
+        return self._update(audio_chunk, speech_prob, rms, ran_silero)
 
-            if not self.speech_started and len(self.speech_frames) >= self.min_speech_frames:
-                self.speech_started = True
-                print(f"[VAD] Speech started (prob={speech_prob:.2f})")
-
-            # Safety: prevent unbounded buffer growth
-            if len(self.speech_frames) >= MAX_AUDIO_BUFFER_FRAMES:
-                print(f"[VAD] Buffer limit reached, forcing utterance end")
-                utterance = np.concatenate(self.speech_frames)
-                self.reset()
-                return is_speech, utterance
+    def _process_batched(self, audio_chunk: np.ndarray) -> tuple[bool, Optional[np.ndarray]]:
+        """
+        Buffer chunks and run Silero once per _batch_size, then replay the
+        onset/offset logic on each chunk in order. Decisions lag by up to one
+        batch (128ms at 4), still under the passive silence timeout.
+        """
+        self._batch[self._n_pending] = audio_chunk
+        self._n_pending += 1
+        if self._n_pending < self._batch_size:
+            return False, None
+        batch = self._batch[:self._n_pending]
+        self._n_pending = 0
 
+        rms = np.sqrt(np.mean(np.square(batch, dtype=np.float32), axis=1))
+        gates = [self._passes_energy_gate(float(r)) for r in rms]
+        ran_silero = self.speech_started or self._onset_frames > 0 or any(gates)
+        if ran_silero:
+            probs = self.model.run_batch(batch)
         else:
-            # Silence
-            if self.speech_started:
-                self.silence_frames += 1
-                self.speech_frames.append(audio_chunk)  # Include trailing silence
-
-                # End of utterance?
-                if self.silence_frames >= self.min_silence_frames:
-                    print(f"[VAD] Speech ended ({len(self.speech_frames)} frames)")
-                    utterance = np.concatenate(self.speech_frames)
-                    self.reset()
-                    return is_speech, utterance
+            probs = [0.0] * len(batch)
+
+        is_speech, utterance = False, None
+        for chunk, speech_prob, chunk_rms in zip(batch, probs, rms):
+            is_speech, ended = self._update(chunk, float(speech_prob), float(chunk_rms), ran_silero)
+            if ended is not None:
+                utterance = ended  # At most one per batch (min silence ≫ batch span)
+        return is_speech, utterance
+
+    def _update(self, audio_chunk: np.ndarray, speech_prob: float, rms: float,
+                ran_silero: bool) -> tuple[bool, Optional[np.ndarray]]:
+        """Advance the onset/offset state machine with one chunk's probability."""
+        if ran_silero:
+            self._chunks_since_silero = 0
+
+        is_speech = speech_prob > VAD_THRESHOLD
+
+        if not is_speech and ran_silero:
+            # Silero-confirmed silence: track the background level
+            if self._noise_floor == 0.0:
+                self._noise_floor = rms
             else:
-                # Pre-speech silence — discard accumulated non-speech frames
-                # but keep a small lookback buffer for speech onset
-                if len(self.speech_frames) > self.min_speech_frames:
-                    self.speech_frames = []
+                self._noise_floor += VAD_NOISE_FLOOR_ALPHA * (rms - self._noise_floor)
+
+        # One handler per (speech_started, is_speech) state, see __init__
+        return is_speech, self._handlers[(self.speech_started << 1) | is_speech](
+            audio_chunk, speech_prob, ran_silero
+        )
+
+    def _push_lookback(self, audio_chunk: np.ndarray):
+        """Pre-speech: the latest chunks wait in the fixed lookback ring."""
+        # Copied in — audio_chunk may be a view into the capture ring
+        self._lookback[self._lookback_pos] = audio_chunk
+        self._lookback_pos = (self._lookback_pos + 1) % len(self._lookback)
+        self._lookback_count = min(self._lookback_count + 1, len(self._lookback))
 
-        return is_speech, None
+    def _on_idle_silence(self, audio_chunk: np.ndarray, speech_prob: float,
+                         ran_silero: bool) -> None:
+        self._push_lookback(audio_chunk)
+        # Onset needs min_speech_frames of speech in a row; silence Silero
+        # confirmed starts the count over (isolated clicks never add up).
+        # A gate-skipped chunk is merely unscored, so it leaves the count alone
+        if ran_silero:
+            self._onset_frames = 0
+
+    def _on_idle_speech(self, audio_chunk: np.ndarray, speech_prob: float,
+                        ran_silero: bool) -> None:
+        self._push_lookback(audio_chunk)
+        self._onset_frames += 1
+        if self._onset_frames >= self.min_speech_frames:
+            self._start_utterance()
+            logger.info("Speech started (prob=%.2f)", speech_prob)
+
+    def _on_speech(self, audio_chunk: np.ndarray, speech_prob: float,
+                   ran_silero: bool) -> Optional[np.ndarray]:
+        # Copied in: audio_chunk may be a view into the server's capture ring
+        self._frame_buf[self._n_frames] = audio_chunk
+        self._n_frames += 1
+        self.silence_frames = 0
+        return self._check_buffer_limit()
+
+    def _on_silence(self, audio_chunk: np.ndarray, speech_prob: float,
+                    ran_silero: bool) -> Optional[np.ndarray]:
+        self.silence_frames += 1
+        if self.silence_frames <= self._pad_frames:
+            self._frame_buf[self._n_frames] = audio_chunk  # Include trailing silence
+            self._n_frames += 1
+
+        # End of utterance?
+        if self.silence_frames >= self.min_silence_frames:
+            logger.info("Speech ended (%d frames)", self._n_frames)
+            return self._take_utterance()
+        return self._check_buffer_limit()
+
+    def _check_buffer_limit(self) -> Optional[np.ndarray]:
+        # Safety: prevent unbounded buffer growth (the buffer is exactly this big)
+        if self._n_frames >= MAX_AUDIO_BUFFER_FRAMES:
+            logger.warning("Buffer limit reached, forcing utterance end")
+            return self._take_utterance()
+        return None
+
+    def _start_utterance(self):
+        """Open an utterance with the lookback ring (onset + lead-in), oldest first."""
+        n = self._lookback_count
+        order = (np.arange(n) + self._lookback_pos - n) % len(self._lookback)
+        self._frame_buf[:n] = self._lookback[order]
+        self._n_frames = n
+        self.silence_frames = 0
+        self.speech_started = True
+
+    def _take_utterance(self) -> np.ndarray:
+        """
+        Copy the buffered frames out as one flat array and reset. One
+        contiguous copy — the caller keeps it while the buffer is reused.
+        """
+        utterance = self._frame_buf[:self._n_frames].reshape(-1).copy()
+        self.reset()
+        return utterance
+
+    def _passes_energy_gate(self, rms: float) -> bool:
+        """
+        Cheap pre-filter: should this chunk go through Silero?
+
+        Loud-enough chunks always do; quiet ones are skipped except every
+        VAD_GATE_REFRESH_CHUNKS-th, which keeps Silero's LSTM state fed.
+        """
+        if rms > self._noise_floor * VAD_GATE_RATIO:
+            return True
+        self._chunks_since_silero += 1
+        return self._chunks_since_silero >= VAD_GATE_REFRESH_CHUNKS
 
     def force_end_utterance(self) -> Optional[np.ndarray]:
         """Force end current utterance (e.g., on timeout). Returns accumulated audio."""
-        if len(self.speech_frames) > 0:
-            print(f"[VAD] Force ending utterance ({len(self.speech_frames)} frames)")
-            utterance = np.concatenate(self.speech_frames)
-            self.reset()
-            return utterance
+        if self._n_frames > 0:
+            logger.info("Force ending utterance (%d frames)", self._n_frames)
+            return self._take_utterance()
         return None
 
     def reset(self):
         """Reset VAD state including Silero's internal LSTM state."""
         self.speech_started = False
-        self.speech_frames = []
+        self._n_frames = 0
         self.silence_frames = 0
+        self._lookback_count = 0
+        self._onset_frames = 0
         # CRITICAL: Reset Silero's internal hidden states (h, c tensors)
         # Without this, LSTM state from previous utterance leaks into next detection
         self.model.reset_states()
\ No newline at end of file
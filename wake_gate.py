@@ -0,0 +1,68 @@
+"""
+Keyword-spotting gate in front of passive transcription.
+
+Most passive utterances are ordinary speech with no wake word in them, and
+each one otherwise costs a full whisper decode just to find that out. An
+openWakeWord model scores the same audio in a few milliseconds; only
+utterances it flags go on to whisper, which then confirms the wake word and
+transcribes any trailing command exactly as before.
+
+Disabled (everything passes) unless openwakeword is installed and
+WAKE_GATE_MODEL_PATHS lists at least one model.
+"""
+
+import os
+import numpy as np
+from config import WAKE_GATE_MODEL_PATHS, WAKE_GATE_THRESHOLD
+
+try:
+    from openwakeword.model import Model as OpenWakeWordModel
+except ImportError:
+    OpenWakeWordModel = None
+
+
+class WakeWordGate:
+    """Cheap first-pass wake word detector for whole utterances."""
+
+    def __init__(self):
+        self._model = None
+        if not WAKE_GATE_MODEL_PATHS:
+            return
+
+        if OpenWakeWordModel is None:
+            print("[WakeGate] openwakeword not installed, gate disabled")
+            return
+        missing = [p for p in WAKE_GATE_MODEL_PATHS if not os.path.exists(p)]
+        if missing:
+            print(f"[WakeGate] Model not found: {', '.join(missing)}, gate disabled")
+            return
+
+        framework = "tflite" if all(p.endswith(".tflite") for p in WAKE_GATE_MODEL_PATHS) else "onnx"
+        self._model = OpenWakeWordModel(
+            wakeword_models=list(WAKE_GATE_MODEL_PATHS),
+            inference_framework=framework,
+        )
+        print(f"[WakeGate] openWakeWord gate enabled (threshold {WAKE_GATE_THRESHOLD})")
+
+    @property
+    def enabled(self) -> bool:
+        return self._model is not None
+
+    def score(self, audio: np.ndarray) -> float:
+        """Highest wake word score over the utterance (1.0 when disabled)."""
+        if self._model is None:
+            return 1.0
+
+        # openWakeWord takes 16kHz int16 PCM
+        if audio.dtype != np.int16:
+            audio = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+
+        # Each utterance is scored on its own: drop the previous one's
+        # feature/prediction buffers first
+        self._model.reset()
+        frames = self._model.predict_clip(audio)
+        return max((max(f.values()) for f in frames if f), default=0.0)
+
+    def passes(self, audio: np.ndarray) -> bool:
+        """Whether the utterance may contain the wake word."""
+        return self.score(audio) >= WAKE_GATE_THRESHOLD
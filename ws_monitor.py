@@ -11,16 +11,24 @@ Usage:
 The server supports one client at a time, so if the extension is
 connected, this will replace it. Run this INSTEAD of the extension
 for debugging, or modify the server to support multiple clients.
+
+Runs on uvloop when it's installed (pip install uvloop), asyncio otherwise.
 """
 
 import asyncio
 import websockets
-import json
+import orjson
 import sys
 import os
+import stat
 from datetime import datetime
 from argparse import ArgumentParser
 
+try:
+    import uvloop  # libuv event loop: faster socket I/O and task wakeups (Linux/macOS)
+except ImportError:
+    uvloop = None
+
 # ANSI colors for terminal readability
 COLORS = {
     "status":    "\033[36m",    # cyan
@@ -39,9 +47,23 @@ def colorize(msg_type: str, text: str) -> str:
     return f"{color}{text}{reset}"
 
 
+# Compact one-line detail per common message type; anything else shows its full JSON
+_FORMATTERS = {
+    "command": lambda d: f'  text: "{d.get("text", "")}"',
+    "error":   lambda d: f'  message: "{d.get("message", "")}"',
+    "status":  lambda d: f'  model={d.get("model")} wake_word="{d.get("wake_word")}"',
+}
+
+
+def _format_extra(data: dict) -> str:
+    extra = {k: v for k, v in data.items() if k != "type"}
+    return f"  {orjson.dumps(extra).decode()}" if extra else ""
+
+
 def format_message(direction: str, data: dict) -> str:
     """Format a message for display."""
-    timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+    now = datetime.now()
+    timestamp = f"{now:%H:%M:%S}.{now.microsecond // 1000:03d}"
     msg_type = data.get("type", "unknown")
 
     if direction == "recv":
@@ -51,17 +73,7 @@ def format_message(direction: str, data: dict) -> str:
         arrow = "──►"
         color_key = "sent"
 
-    # Compact display for common types
-    if msg_type == "command":
-        detail = f'  text: "{data.get("text", "")}"'
-    elif msg_type == "error":
-        detail = f'  message: "{data.get("message", "")}"'
-    elif msg_type == "status":
-        detail = f'  model={data.get("model")} wake_word="{data.get("wake_word")}"'
-    else:
-        # Show full JSON for anything else
-        extra = {k: v for k, v in data.items() if k != "type"}
-        detail = f"  {json.dumps(extra)}" if extra else ""
+    detail = _FORMATTERS.get(msg_type, _format_extra)(data)
 
     line = f"[{timestamp}] {arrow} {msg_type}{detail}"
     return colorize(color_key, line)
@@ -77,8 +89,11 @@ class WSMonitor:
 
     async def run(self):
         if self.log_file:
-            self.log_handle = open(self.log_file, "a")
+            # orjson writes bytes; 64KB buffer flushed once a second by
+            # _periodic_flush instead of a write syscall per message
+            self.log_handle = open(self.log_file, "ab", buffering=1 << 16)
             print(f"Logging to: {self.log_file}")
+            flush_task = asyncio.create_task(self._periodic_flush())
 
         print(f"Connecting to {self.url} ...")
         print(f"{'─' * 60}")
@@ -104,17 +119,40 @@ class WSMonitor:
             pass
         finally:
             if self.log_handle:
-                self.log_handle.close()
+                flush_task.cancel()
+                self.log_handle.close()  # Flushes what's still buffered
             print(f"\n{'─' * 60}")
             print(f"Session ended. {self.message_count} messages received.")
 
+    def _log(self, direction: bytes, raw, data: dict):
+        """
+        Append one {"ts", "direction", "data"} JSONL line. `raw` is the
+        message's JSON text, already validated by orjson.loads, so it's
+        spliced in as-is rather than re-serialized; only JSON spanning
+        several lines (which would split the JSONL record) is re-encoded.
+        """
+        if isinstance(raw, str):
+            raw = raw.encode()
+        if b"\n" in raw or b"\r" in raw:
+            raw = orjson.dumps(data)
+        ts = datetime.now().isoformat(timespec="milliseconds").encode()
+        self.log_handle.write(
+            b'{"ts":"' + ts + b'","direction":"' + direction + b'","data":' + raw + b"}\n"
+        )
+
+    async def _periodic_flush(self, interval_s: float = 1.0):
+        """Push buffered log lines to disk at most `interval_s` late."""
+        while True:
+            await asyncio.sleep(interval_s)
+            self.log_handle.flush()
+
     async def receive_loop(self, ws):
         """Receive and display all messages from the server."""
         try:
             async for raw in ws:
                 try:
-                    data = json.loads(raw)
-                except json.JSONDecodeError:
+                    data = orjson.loads(raw)
+                except orjson.JSONDecodeError:
                     print(f"[??] Non-JSON: {raw[:100]}")
                     continue
 
@@ -123,23 +161,45 @@ class WSMonitor:
 
                 # Log to file as JSONL (one JSON object per line)
                 if self.log_handle:
-                    log_entry = {
-                        "ts": datetime.now().isoformat(),
-                        "direction": "recv",
-                        "data": data
-                    }
-                    self.log_handle.write(json.dumps(log_entry) + "\n")
-                    self.log_handle.flush()
+                    self._log(b"recv", raw, data)
 
         except websockets.exceptions.ConnectionClosed as e:
             print(colorize("error", f"Connection closed: {e}"))
 
+    @staticmethod
+    async def _stdin_reader():
+        """
+        Async reader over stdin, or None where the event loop can't watch it
+        (Windows, or stdin redirected from a regular file).
+        """
+        if sys.platform == "win32":
+            return None
+        # Checked up front: uvloop aborts (rather than raising) on a regular file
+        try:
+            mode = os.fstat(sys.stdin.fileno()).st_mode
+        except (OSError, ValueError):
+            return None
+        if not (stat.S_ISFIFO(mode) or stat.S_ISCHR(mode) or stat.S_ISSOCK(mode)):
+            return None
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        try:
+            await loop.connect_read_pipe(
+                lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+            )
+        except (ValueError, OSError):
+            return None
+        return reader
+
     async def interactive_sender(self, ws):
         """
         Interactive mode: read commands from stdin and send them.
-        Runs in a thread to not block the event loop.
+        stdin is read by the event loop itself; only where that's impossible
+        does each line come from input() on an executor thread.
         """
         loop = asyncio.get_running_loop()
+        reader = await self._stdin_reader()
+        prompt = colorize("sent", "send> ")
 
         HELP = """
 Commands (type and press Enter):
@@ -153,13 +213,18 @@ Commands (type and press Enter):
         print(colorize("sent", HELP))
 
         while True:
-            try:
-                # Read from stdin in thread pool (non-blocking)
-                line = await loop.run_in_executor(
-                    None, lambda: input(colorize("sent", "send> "))
-                )
-            except EOFError:
-                break
+            if reader is not None:
+                print(prompt, end="", flush=True)
+                raw_line = await reader.readline()
+                if not raw_line:
+                    break  # EOF
+                line = raw_line.decode(errors="replace")
+            else:
+                try:
+                    # Fallback: blocking input() on a pool thread
+                    line = await loop.run_in_executor(None, input, prompt)
+                except EOFError:
+                    break
 
             line = line.strip()
             if not line:
@@ -175,8 +240,8 @@ Commands (type and press Enter):
                 msg = {"type": "ack", "result": line[4:]}
             elif line.startswith("raw "):
                 try:
-                    msg = json.loads(line[4:])
-                except json.JSONDecodeError as e:
+                    msg = orjson.loads(line[4:])
+                except orjson.JSONDecodeError as e:
                     print(colorize("error", f"Invalid JSON: {e}"))
                     continue
             elif line == "help":
@@ -189,18 +254,12 @@ Commands (type and press Enter):
                 continue
 
             if msg:
-                raw = json.dumps(msg)
+                raw = orjson.dumps(msg).decode()  # Text frame, as the extension sends
                 await ws.send(raw)
                 print(format_message("send", msg))
 
                 if self.log_handle:
-                    log_entry = {
-                        "ts": datetime.now().isoformat(),
-                        "direction": "send",
-                        "data": msg
-                    }
-                    self.log_handle.write(json.dumps(log_entry) + "\n")
-                    self.log_handle.flush()
+                    self._log(b"send", raw, msg)
 
 
 def main():
@@ -220,7 +279,10 @@ def main():
     args = parser.parse_args()
 
     monitor = WSMonitor(args.url, log_file=args.log, interactive=args.interactive)
-    asyncio.run(monitor.run())
+    if uvloop is not None:
+        uvloop.run(monitor.run())
+    else:
+        asyncio.run(monitor.run())
 
 
 if __name__ == "__main__":